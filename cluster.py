@@ -0,0 +1,125 @@
+# cluster.py
+#
+# Runs the bot as several worker processes, each owning a contiguous group of shards:
+#   SHARD_COUNT=8 CLUSTER_COUNT=4 python cluster.py
+# SHARD_COUNT defaults to Discord's recommendation, CLUSTER_COUNT to the number of CPUs.
+# Each worker is a full bot (see main.create_bot) with its own caches; workers only share
+# settings.db, which they open in WAL mode with a busy timeout (see database/db.py).
+
+import asyncio
+import logging
+import multiprocessing
+import os
+import time
+from dotenv import load_dotenv
+
+from utils.logging_setup import setup_logging
+
+from database.shard_store import init_shard_db, clear_shard_health, get_shard_health
+from utils.sharding import shard_groups, fetch_recommended_shard_count, HEALTH_INTERVAL_SECONDS, STALE_AFTER_SECONDS
+
+load_dotenv()
+
+IDENTIFY_SPACING_SECONDS = 5  # Discord allows one IDENTIFY per 5s per bucket
+MAX_RESTART_DELAY_SECONDS = 300
+STABLE_AFTER_SECONDS = 300  # a worker that ran this long resets its crash backoff
+
+logger = logging.getLogger("cluster")
+
+
+def run_worker(cluster_id: int, shard_ids: list[int], shard_count: int):
+    import main
+
+    bot = main.create_bot(shard_ids=shard_ids, shard_count=shard_count, cluster_id=cluster_id)
+    bot.run(main.TOKEN, log_handler=None)
+
+
+def print_health():
+    now = time.time()
+    for shard_id, cluster_id, pid, latency, guilds, updated_at in get_shard_health():
+        age = now - updated_at
+        state = "❌ stale" if age > STALE_AFTER_SECONDS else "✅"
+        latency_text = "n/a" if latency is None else f"{latency * 1000:.0f}ms"
+        logger.info(
+            "   %s shard %s (cluster %s, pid %s): %s, %s guild(s), reported %.0fs ago",
+            state, shard_id, cluster_id, pid, latency_text, guilds, age
+        )
+
+
+class Cluster:
+    def __init__(self, cluster_id: int, shard_ids: list[int], shard_count: int):
+        self.cluster_id = cluster_id
+        self.shard_ids = shard_ids
+        self.shard_count = shard_count
+        self.process = None
+        self.started_at = 0.0
+        self.failures = 0
+        self.restart_at = None
+
+    def start(self, ctx):
+        self.process = ctx.Process(
+            target=run_worker,
+            args=(self.cluster_id, self.shard_ids, self.shard_count),
+            name=f"cluster-{self.cluster_id}"
+        )
+        self.process.start()
+        self.started_at = time.time()
+        self.restart_at = None
+        logger.info("🚀 Cluster %s started (pid %s) with shard(s) %s", self.cluster_id, self.process.pid, self.shard_ids)
+
+    def check(self, ctx):
+        if self.process.is_alive():
+            return
+
+        if self.restart_at is None:
+            if time.time() - self.started_at >= STABLE_AFTER_SECONDS:
+                self.failures = 0
+            self.failures += 1
+            delay = min(MAX_RESTART_DELAY_SECONDS, IDENTIFY_SPACING_SECONDS * 2 ** self.failures)
+            self.restart_at = time.time() + delay
+            logger.warning(
+                "⚠️ Cluster %s exited with code %s, restarting in %ss", self.cluster_id, self.process.exitcode, delay
+            )
+        elif time.time() >= self.restart_at:
+            self.start(ctx)
+
+
+def main():
+    setup_logging()
+    token = os.getenv("DISCORD_TOKEN")
+    shard_count = int(os.getenv("SHARD_COUNT") or 0) or asyncio.run(fetch_recommended_shard_count(token))
+    cluster_count = int(os.getenv("CLUSTER_COUNT") or os.cpu_count() or 1)
+    groups = shard_groups(shard_count, cluster_count)
+
+    init_shard_db()
+    clear_shard_health()
+
+    logger.info("🧩 Running %s shard(s) across %s cluster(s)", shard_count, len(groups))
+    ctx = multiprocessing.get_context("spawn")
+    clusters = [Cluster(cluster_id, shard_ids, shard_count) for cluster_id, shard_ids in enumerate(groups)]
+
+    try:
+        for cluster in clusters:
+            cluster.start(ctx)
+            # Workers identify independently, so stagger them to stay inside the identify limit.
+            time.sleep(IDENTIFY_SPACING_SECONDS * len(cluster.shard_ids))
+
+        while True:
+            time.sleep(HEALTH_INTERVAL_SECONDS)
+            for cluster in clusters:
+                cluster.check(ctx)
+            logger.info("🩺 Shard health:")
+            print_health()
+    except KeyboardInterrupt:
+        logger.info("🛑 Stopping clusters…")
+    finally:
+        for cluster in clusters:
+            if cluster.process and cluster.process.is_alive():
+                cluster.process.terminate()
+        for cluster in clusters:
+            if cluster.process:
+                cluster.process.join(timeout=30)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+# cogs/backup.py
+
+import discord
+from discord.ext import commands
+from discord import app_commands
+import asyncio
+import logging
+import time
+
+from database.config_store import get_config
+from database.backup import (
+    backup_database, list_backups, prune_backups, seconds_since_last_backup, restore_backup, backup_exists
+)
+
+DEFAULT_INTERVAL_HOURS = 24
+DEFAULT_KEEP = 7
+CHECK_INTERVAL_SECONDS = 600
+
+log = logging.getLogger(__name__)
+
+
+class Backup(commands.Cog):
+    def __init__(self, bot):
+        self.bot = bot
+        self.lock = asyncio.Lock()
+
+    async def cog_load(self):
+        # Every cluster shares settings.db, so only cluster 0 runs the schedule.
+        if getattr(self.bot, "cluster_id", 0) == 0:
+            self.bot.scheduler.register("backup.scheduled", self.scheduled_backup, CHECK_INTERVAL_SECONDS)
+
+    def cog_unload(self):
+        self.bot.scheduler.unregister("backup.scheduled")
+
+    async def run_backup(self) -> str:
+        async with self.lock:
+            started = time.perf_counter()
+            name = await asyncio.to_thread(backup_database)
+            removed = await asyncio.to_thread(prune_backups, get_config("backup_keep") or DEFAULT_KEEP)
+            log.info("💾 Backed up settings.db to %s in %.1fs (pruned %d)", name, time.perf_counter() - started, len(removed))
+            return name
+
+    async def scheduled_backup(self):
+        # Measured from the newest snapshot on disk, so restarts and interval changes are honoured.
+        interval = (get_config("backup_interval_hours") or DEFAULT_INTERVAL_HOURS) * 3600
+        age = await asyncio.to_thread(seconds_since_last_backup)
+        if age is None or age >= interval:
+            await self.run_backup()
+
+    @app_commands.command(name="backup_now", description="(ADMIN ONLY) Snapshot the bot database now.")
+    @app_commands.checks.has_permissions(administrator=True)
+    async def backup_now(self, interaction: discord.Interaction):
+        await interaction.response.defer(ephemeral=True)
+        try:
+            name = await self.run_backup()
+        except Exception as e:
+            return await interaction.followup.send(f"❌ Backup failed: `{e}`", ephemeral=True)
+        await interaction.followup.send(f"💾 Saved backup `{name}`.", ephemeral=True)
+
+    @app_commands.command(name="backup_list", description="(ADMIN ONLY) List database backups.")
+    @app_commands.checks.has_permissions(administrator=True)
+    async def backup_list(self, interaction: discord.Interaction):
+        backups = await asyncio.to_thread(list_backups)
+        lines = [f"`{name}` • {size / 1024:.0f} KiB • <t:{int(mtime)}:R>" for name, size, mtime in backups]
+        embed = discord.Embed(
+            title="💾 Database Backups",
+            description="\n".join(lines)[:4000] or "*No backups yet.*",
+            color=discord.Color.blurple()
+        )
+        embed.set_footer(
+            text=f"Every {get_config('backup_interval_hours') or DEFAULT_INTERVAL_HOURS}h, "
+                 f"keeping {get_config('backup_keep') or DEFAULT_KEEP}"
+        )
+        await interaction.response.send_message(embed=embed, ephemeral=True)
+
+    @app_commands.command(name="backup_restore", description="(ADMIN ONLY) Restore the bot database from a backup.")
+    @app_commands.describe(name="The backup to restore (see /backup_list)")
+    @app_commands.checks.has_permissions(administrator=True)
+    async def backup_restore(self, interaction: discord.Interaction, name: str):
+        await interaction.response.defer(ephemeral=True)
+        async with self.lock:
+            # Checked before the safety snapshot so a mistyped name doesn't write a backup.
+            if not await asyncio.to_thread(backup_exists, name):
+                return await interaction.followup.send(f"❌ No backup named `{name}`.", ephemeral=True)
+            try:
+                # Snapshot the current state first so a restore can itself be undone.
+                safety = await asyncio.to_thread(backup_database)
+                await asyncio.to_thread(restore_backup, name)
+            except FileNotFoundError:
+                return await interaction.followup.send(f"❌ No backup named `{name}`.", ephemeral=True)
+            except Exception as e:
+                return await interaction.followup.send(f"❌ Restore failed: `{e}`", ephemeral=True)
+            # Pruned only after the restore, which may have been reading the oldest snapshot.
+            await asyncio.to_thread(prune_backups, get_config("backup_keep") or DEFAULT_KEEP)
+
+        self.bot.message_router.rebuild()
+        log.warning("♻️ Restored settings.db from %s (previous state saved as %s)", name, safety)
+        await interaction.followup.send(
+            f"♻️ Restored `{name}`. The previous state was saved as `{safety}`.\n"
+            "Cogs that cache settings in memory pick up the restored values after a restart.",
+            ephemeral=True
+        )
+
+    @backup_restore.autocomplete("name")
+    async def backup_name_autocomplete(self, interaction: discord.Interaction, current: str):
+        backups = await asyncio.to_thread(list_backups)
+        return [app_commands.Choice(name=name, value=name) for name, _, _ in backups if current in name][:25]
+
+
+async def setup(bot):
+    await bot.add_cog(Backup(bot))
@@ -0,0 +1,121 @@
+# cogs/bot_stats.py
+
+import discord
+from discord.ext import commands
+from discord import app_commands
+from aiohttp import web
+import asyncio
+import logging
+import math
+import os
+import time
+from dotenv import load_dotenv
+
+from utils.metrics import registry
+from utils.views import view_store_report
+
+load_dotenv()
+
+METRICS_HOST = os.getenv("METRICS_HOST", "127.0.0.1")
+METRICS_PORT = os.getenv("METRICS_PORT")  # endpoint stays off unless a port is set
+LAG_INTERVAL_SECONDS = 0.5
+
+log = logging.getLogger(__name__)
+
+
+class BotStats(commands.Cog):
+    def __init__(self, bot):
+        self.bot = bot
+        self.started_at = time.time()
+        self.lag_task = None
+        self.runner = None
+
+    async def cog_load(self):
+        self.lag_task = asyncio.create_task(self.monitor_loop_lag())
+        if METRICS_PORT:
+            await self.start_http_server()
+
+    async def cog_unload(self):
+        if self.lag_task:
+            self.lag_task.cancel()
+        if self.runner:
+            await self.runner.cleanup()
+
+    async def monitor_loop_lag(self):
+        while True:
+            start = time.perf_counter()
+            await asyncio.sleep(LAG_INTERVAL_SECONDS)
+            lag = max(0.0, time.perf_counter() - start - LAG_INTERVAL_SECONDS)
+            registry.observe("bot_event_loop_lag_seconds", lag)
+
+    async def start_http_server(self):
+        app = web.Application()
+        app.router.add_get("/metrics", self.handle_metrics)
+        self.runner = web.AppRunner(app, access_log=None)
+        await self.runner.setup()
+        try:
+            await web.TCPSite(self.runner, METRICS_HOST, int(METRICS_PORT)).start()
+            log.info("Serving metrics on http://%s:%s/metrics", METRICS_HOST, METRICS_PORT)
+        except OSError as e:
+            log.error("Failed to start metrics endpoint: %s", e)
+            await self.runner.cleanup()
+            self.runner = None
+
+    async def handle_metrics(self, request):
+        registry.set("bot_uptime_seconds", time.time() - self.started_at)
+        if not math.isnan(self.bot.latency):
+            registry.set("bot_gateway_latency_seconds", self.bot.latency)
+        registry.set("bot_guilds", len(self.bot.guilds))
+        for name, count in view_store_report(self.bot).items():
+            registry.set("bot_view_store_entries", count, kind=name)
+        return web.Response(text=registry.render(), content_type="text/plain", charset="utf-8")
+
+    @app_commands.command(name="bot_stats", description="(ADMIN ONLY) Show handler latency, DB usage and event loop lag.")
+    @app_commands.checks.has_permissions(administrator=True)
+    async def show_bot_stats(self, interaction: discord.Interaction):
+        embed = discord.Embed(title="📈 Bot Stats", color=discord.Color.blurple())
+
+        uptime = int(time.time() - self.started_at)
+        gateway = "n/a" if math.isnan(self.bot.latency) else f"{self.bot.latency * 1000:.0f}ms"
+        lag = registry.histograms.get("bot_event_loop_lag_seconds", {}).get(())
+        lag_text = (
+            f"p50 `{lag.percentile(50) * 1000:.1f}ms` • p95 `{lag.percentile(95) * 1000:.1f}ms` • max `{lag.max * 1000:.1f}ms`"
+            if lag else "no samples yet"
+        )
+        embed.description = (
+            f"Uptime: `{uptime // 3600}h {uptime % 3600 // 60}m` • Gateway: `{gateway}`\n"
+            f"Event loop lag: {lag_text}"
+        )
+
+        handlers = registry.histograms.get("bot_handler_seconds", {})
+        errors = registry.counters.get("bot_handler_errors_total", {})
+        busiest = sorted(handlers.items(), key=lambda item: item[1].sum, reverse=True)[:8]
+        for labels, histogram in busiest:
+            label_map = dict(labels)
+            embed.add_field(
+                name=f"{label_map['name']} ({label_map['kind']})",
+                value=(
+                    f"Calls `{histogram.count}` • Errors `{errors.get(labels, 0):.0f}`\n"
+                    f"p50 `{histogram.percentile(50) * 1000:.1f}ms` • p95 `{histogram.percentile(95) * 1000:.1f}ms` "
+                    f"• max `{histogram.max * 1000:.1f}ms`"
+                ),
+                inline=False
+            )
+
+        db_calls = registry.histograms.get("bot_db_seconds", {})
+        if db_calls:
+            total_calls = sum(h.count for h in db_calls.values())
+            total_time = sum(h.sum for h in db_calls.values())
+            top = sorted(db_calls.items(), key=lambda item: item[1].count, reverse=True)[:5]
+            lines = [f"`{dict(labels)['store']}.{dict(labels)['call']}`: {h.count} call(s)" for labels, h in top]
+            embed.add_field(
+                name=f"Database: {total_calls} call(s), {total_time * 1000:.0f}ms total",
+                value="\n".join(lines),
+                inline=False
+            )
+
+        await interaction.response.send_message(embed=embed, ephemeral=True)
+
+
+async def setup(bot):
+    await bot.add_cog(BotStats(bot))
@@ -1,11 +1,23 @@
 # cogs/counting_game.py
 
 import discord
-from discord.ext import commands
+from discord.ext import commands, tasks
 from discord import app_commands
+import asyncio
+import time
 
 from database.config_store import get_config, set_config
-from database.stats_store import get_user_stat, increment_user_stat, set_global_stat
+from database.stats_store import (
+    get_user_stat, increment_user_stat, set_global_stat, get_top_users, get_top_users_windowed, prune_stat_buckets
+)
+from database.counting_store import (
+    init_counting_db, append_events, compact_events, get_recent_runs, get_longest_runs, get_user_record
+)
+
+EVENT_FLUSH_SECONDS = 5
+# Per-message events are kept this long after a run ends; after that only its summary remains.
+EVENT_RETENTION_DAYS = 30
+MAINTENANCE_INTERVAL_SECONDS = 3600
 
 class CountingGame(commands.Cog):
     def __init__(self, bot):
@@ -14,19 +26,49 @@ class CountingGame(commands.Cog):
         # Updated emoji cycle
         self.EMOJI_CYCLE = ["✅", "☑️", "🔥", "❤️‍🔥", "🌟"]
 
+        # Events are buffered here and written in batches by flush_events.
+        init_counting_db()
+        self.pending_events = []
+        self.run_id = get_config("counting_run_id") or 1
+        self.flush_events.start()
+
+        # Only messages in the counting channel reach on_counting_message; see utils/message_router.py
+        bot.message_router.register("counting_channel_id", self.on_counting_message)
+
+    async def cog_load(self):
+        self.bot.scheduler.register("counting.maintenance", self.compact_history, MAINTENANCE_INTERVAL_SECONDS)
+
+    async def cog_unload(self):
+        self.bot.message_router.unregister(self.on_counting_message)
+        self.bot.scheduler.unregister("counting.maintenance")
+        self.flush_events.cancel()
+        await self.write_pending_events()
+
+    def record_event(self, user_id: int, number: int, kind: str):
+        self.pending_events.append((self.run_id, user_id, number, kind, time.time()))
+
+    async def write_pending_events(self):
+        if not self.pending_events:
+            return
+        batch, self.pending_events = self.pending_events, []
+        await asyncio.to_thread(append_events, batch)
+
+    @tasks.loop(seconds=EVENT_FLUSH_SECONDS)
+    async def flush_events(self):
+        await self.write_pending_events()
+
+    async def compact_history(self):
+        await asyncio.to_thread(compact_events, time.time() - EVENT_RETENTION_DAYS * 86400)
+        await asyncio.to_thread(prune_stat_buckets)
+
     def get_cycle_emoji(self, count: int) -> str:
         index = (count // 100) % len(self.EMOJI_CYCLE)
         return self.EMOJI_CYCLE[index]
 
-    @commands.Cog.listener()
-    async def on_message(self, message: discord.Message):
+    async def on_counting_message(self, message: discord.Message):
         if message.author.bot:
             return
 
-        counting_channel_id = get_config("counting_channel_id")
-        if not counting_channel_id or message.channel.id != int(counting_channel_id):
-            return
-
         if get_config("counting_paused"):
             return
 
@@ -48,23 +90,30 @@ class CountingGame(commands.Cog):
             except ValueError:
                 return
 
+            # State is committed before any await so the next message's handler, which may start
+            # while this one waits on Discord, always validates against the updated count.
             if user_count != expected_count or user_id == last_user_id:
+                set_config("current_count", 0)
+                set_config("last_counter_id", None)
+                self.record_event(user_id, user_count, "break")
+                self.run_id += 1
+                set_config("counting_run_id", self.run_id)
+
                 await message.add_reaction("💥")
                 await message.channel.send(
                     f"❌ {message.author.mention} broke the count at `{user_count}`. Start again from 1!",
                     delete_after=6
                 )
-                set_config("current_count", 0)
-                set_config("last_counter_id", None)
                 return
 
             # ✅ Correct count
-            reaction_emoji = self.get_cycle_emoji(expected_count)
-            await message.add_reaction(reaction_emoji)
-
             set_config("current_count", user_count)
             set_config("last_counter_id", user_id)
             increment_user_stat(user_id, "counting_score")
+            self.record_event(user_id, user_count, "count")
+
+            reaction_emoji = self.get_cycle_emoji(expected_count)
+            await message.add_reaction(reaction_emoji)
 
             # 🎉 Celebration message on each 100th count
             if user_count % 100 == 0:
@@ -90,6 +139,72 @@ class CountingGame(commands.Cog):
         score = get_user_stat(interaction.user.id, "counting_score")
         await interaction.response.send_message(f"🧮 {interaction.user.mention}, your counting score is `{score}`!")
 
+    @app_commands.command(name="counting_top", description="Show the top counters for today, this week, this month or all time.")
+    @app_commands.describe(period="Which leaderboard to show")
+    @app_commands.choices(period=[
+        app_commands.Choice(name="Today", value="day"),
+        app_commands.Choice(name="This week", value="week"),
+        app_commands.Choice(name="This month", value="month"),
+        app_commands.Choice(name="All time", value="all"),
+    ])
+    async def counting_top(self, interaction: discord.Interaction, period: str = "week"):
+        if period == "all":
+            top = await asyncio.to_thread(get_top_users, "counting_score", 10)
+        else:
+            top = await asyncio.to_thread(get_top_users_windowed, "counting_score", period, 10)
+
+        lines = [f"`#{i}` <@{user_id}> • `{value}`" for i, (user_id, value) in enumerate(top, start=1)]
+        titles = {"day": "Today", "week": "This Week", "month": "This Month", "all": "All Time"}
+        embed = discord.Embed(
+            title=f"🧮 Top Counters • {titles[period]}",
+            description="\n".join(lines) or "*Nobody has counted yet.*",
+            color=discord.Color.blurple()
+        )
+        await interaction.response.send_message(embed=embed, allowed_mentions=discord.AllowedMentions.none())
+
+    @app_commands.command(name="counting_history", description="Show how the most recent counting runs ended.")
+    async def counting_history(self, interaction: discord.Interaction):
+        runs = await asyncio.to_thread(get_recent_runs, 10)
+        current = get_config("current_count") or 0
+
+        lines = [f"▶️ **Run #{self.run_id}** (in progress) • at `{current}`"]
+        for run_id, started_at, ended_at, length, counts, participants, broken_by, broken_at in runs:
+            lines.append(
+                f"💥 **Run #{run_id}** • reached `{length}` • {counts} count(s) by {participants} counter(s) • "
+                f"broken by <@{broken_by}> with `{broken_at}` <t:{int(ended_at)}:R>"
+            )
+
+        embed = discord.Embed(title="🧮 Counting History", description="\n".join(lines), color=discord.Color.blurple())
+        await interaction.response.send_message(embed=embed, allowed_mentions=discord.AllowedMentions.none())
+
+    @app_commands.command(name="counting_record", description="Show the longest counting runs and a member's record.")
+    @app_commands.describe(member="Whose record to show (defaults to you)")
+    async def counting_record(self, interaction: discord.Interaction, member: discord.Member = None):
+        member = member or interaction.user
+        longest = await asyncio.to_thread(get_longest_runs, 3)
+        runs, counts, best, breaks = await asyncio.to_thread(get_user_record, member.id)
+
+        embed = discord.Embed(title="🏆 Counting Records", color=discord.Color.gold())
+        medals = ["🥇", "🥈", "🥉"]
+        embed.add_field(
+            name="Longest runs",
+            value="\n".join(
+                f"{medals[i]} `{length}` • Run #{run_id} • {participants} counter(s) • ended <t:{int(ended_at)}:d>"
+                for i, (run_id, started_at, ended_at, length, _, participants, _, _) in enumerate(longest)
+            ) or "*No finished runs yet.*",
+            inline=False
+        )
+        embed.add_field(
+            name=f"{member.display_name}",
+            value=(
+                f"Runs joined: `{runs}` • Counts: `{counts}`\n"
+                f"Best run: `{best}` • Runs broken: `{breaks}`"
+            ),
+            inline=False
+        )
+        embed.set_footer(text="Finished runs only; the current run is added when it ends.")
+        await interaction.response.send_message(embed=embed)
+
     @app_commands.command(
     name="set_count",
     description="(ADMIN ONLY) Manually set the current counting number."
@@ -6,24 +6,71 @@ from discord import app_commands
 import os
 from dotenv import load_dotenv
 import traceback
+import asyncio
+import cProfile
+import io
+import pstats
+import tracemalloc
+
+from utils.command_sync import sync_commands
+from utils.sharding import STALE_AFTER_SECONDS
+from utils.views import view_store_report
+from utils.metrics import registry
+from utils.scheduler import MAX_CONCURRENT_JOBS
+from database.shard_store import get_shard_health
+import time
 
 load_dotenv()
 DEVELOPER_ID = int(os.getenv("DEVELOPER_ID"))
 GUILD_ID = int(os.getenv("GUILD_ID"))
 
+MEMORY_SNAPSHOT_FILTERS = [
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+    tracemalloc.Filter(False, "<unknown>"),
+]
+
+
+def take_memory_snapshot():
+    return tracemalloc.take_snapshot().filter_traces(MEMORY_SNAPSHOT_FILTERS)
+
+
+# Selector calls where the event loop sits waiting for I/O; reported as idle rather than as a hot spot.
+IDLE_FUNCTIONS = ("<method 'poll' of 'select.epoll' objects>", "<method 'select' of 'select.poll' objects>",
+                  "<method 'control' of 'select.kqueue' objects>", "<built-in method select.select>")
+
+
+def short_location(filename: str, lineno: int) -> str:
+    if "site-packages" in filename:
+        filename = filename.split("site-packages", 1)[1].lstrip("/\\")
+    elif filename.startswith(os.getcwd()):
+        filename = os.path.relpath(filename)
+    elif not filename.startswith(("<", "~")):
+        filename = os.path.basename(filename)
+    return f"{filename}:{lineno}"
+
+
 class DevTools(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
+        self.profiling = False
+        self.memory_baseline = None
 
     def is_developer(self, interaction: discord.Interaction) -> bool:
         return interaction.user.id == DEVELOPER_ID
 
     @app_commands.command(name="sync", description="(DEV ONLY) 🔁 Sync all slash commands globally.")
-    async def sync(self, interaction: discord.Interaction):
+    @app_commands.describe(force="Sync even if the command tree hasn't changed since the last sync")
+    async def sync(self, interaction: discord.Interaction, force: bool = False):
         if not self.is_developer(interaction):
             return await interaction.response.send_message("❌ You are not authorized to use this.", ephemeral=True)
-        await self.bot.tree.sync()
-        await interaction.response.send_message("✅ Slash commands synced.", ephemeral=True)
+        await interaction.response.defer(ephemeral=True)
+        synced = await sync_commands(self.bot.tree, force=force)
+        if synced is None:
+            await interaction.followup.send("⏭️ Slash commands unchanged, skipped sync. Use `force` to sync anyway.", ephemeral=True)
+        else:
+            await interaction.followup.send(f"✅ Synced {len(synced)} slash command(s).", ephemeral=True)
 
     @app_commands.command(name="eval", description="(DEV ONLY) ⚙️ Evaluate a Python expression.")
     @app_commands.describe(code="The Python code to evaluate")
@@ -44,12 +91,113 @@ class DevTools(commands.Cog):
             return await interaction.response.send_message("❌ You are not authorized to use this.", ephemeral=True)
 
         try:
+            # Cogs with export_state/import_state hand their in-memory state over; see utils/state_handoff.py
             await self.bot.reload_extension(f"cogs.{cog}")
             await interaction.response.send_message(f"✅ Reloaded cog: `{cog}`", ephemeral=True)
         except Exception as e:
             traceback_str = ''.join(traceback.format_exception(type(e), e, e.__traceback__))
             await interaction.response.send_message(f"❌ Failed to reload cog `{cog}`:\n```{traceback_str[:1900]}```", ephemeral=True)
 
+    @app_commands.command(name="profile", description="(DEV ONLY) 🔬 CPU-profile the event loop for a few seconds.")
+    @app_commands.describe(seconds="How long to sample (1-60)")
+    async def profile(self, interaction: discord.Interaction, seconds: app_commands.Range[int, 1, 60] = 10):
+        if not self.is_developer(interaction):
+            return await interaction.response.send_message("❌ You are not authorized to use this.", ephemeral=True)
+        if self.profiling:
+            return await interaction.response.send_message("⏳ A profile is already running.", ephemeral=True)
+
+        await interaction.response.defer(ephemeral=True)
+
+        # cProfile hooks the calling thread, which is the event loop thread, so everything the loop
+        # runs while we sleep is captured. Work pushed to worker threads (e.g. PRAW calls) is not.
+        profiler = cProfile.Profile()
+        self.profiling = True
+        profiler.enable()
+        try:
+            await asyncio.sleep(seconds)
+        finally:
+            profiler.disable()
+            self.profiling = False
+
+        report = io.StringIO()
+        stats = pstats.Stats(profiler, stream=report)
+        stats.sort_stats("tottime").print_stats(50)
+        stats.sort_stats("cumulative").print_stats(50)
+
+        idle = sum(entry[2] for (_, _, func), entry in stats.stats.items() if func in IDLE_FUNCTIONS)
+        busy = [item for item in stats.stats.items() if item[0][2] not in IDLE_FUNCTIONS]
+        top = sorted(busy, key=lambda item: item[1][2], reverse=True)[:10]
+        lines = [
+            f"`{tottime * 1000:8.1f}ms` {func} ({short_location(filename, lineno)}) ×{calls}"
+            for (filename, lineno, func), (_, calls, tottime, _, _) in top
+        ]
+
+        embed = discord.Embed(
+            title=f"🔬 CPU profile ({seconds}s)",
+            description="Top functions by own time:\n" + ("\n".join(lines)[:3900] or "*No samples.*"),
+            color=discord.Color.dark_teal()
+        )
+        embed.set_footer(
+            text=f"{stats.total_calls} calls • {stats.total_tt - idle:.3f}s busy, {idle:.3f}s idle on the event loop thread"
+        )
+
+        report_file = discord.File(io.BytesIO(report.getvalue().encode("utf-8")), filename="profile.txt")
+        await interaction.followup.send(embed=embed, file=report_file, ephemeral=True)
+
+    @app_commands.command(name="memprofile", description="(DEV ONLY) 🧠 Snapshot memory allocations and diff against the last snapshot.")
+    @app_commands.describe(stop="Stop tracing allocations and drop the baseline")
+    async def memprofile(self, interaction: discord.Interaction, stop: bool = False):
+        if not self.is_developer(interaction):
+            return await interaction.response.send_message("❌ You are not authorized to use this.", ephemeral=True)
+
+        if stop:
+            tracemalloc.stop()
+            self.memory_baseline = None
+            return await interaction.response.send_message("🛑 Allocation tracing stopped.", ephemeral=True)
+
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self.memory_baseline = await asyncio.to_thread(take_memory_snapshot)
+            return await interaction.response.send_message(
+                "🧠 Allocation tracing started. Run `/memprofile` again to see what grew since now.",
+                ephemeral=True
+            )
+
+        await interaction.response.defer(ephemeral=True)
+
+        snapshot = await asyncio.to_thread(take_memory_snapshot)
+        baseline = self.memory_baseline or snapshot
+        diff = await asyncio.to_thread(snapshot.compare_to, baseline, "lineno")
+        current = await asyncio.to_thread(snapshot.statistics, "lineno")
+        self.memory_baseline = snapshot
+
+        traced, peak = tracemalloc.get_traced_memory()
+
+        report = io.StringIO()
+        report.write("Top growth since last snapshot:\n")
+        for stat in diff[:50]:
+            report.write(f"{stat}\n")
+        report.write("\nTop allocation sites:\n")
+        for stat in current[:50]:
+            report.write(f"{stat}\n")
+
+        lines = []
+        for stat in diff[:10]:
+            frame = stat.traceback[0]
+            lines.append(
+                f"`{stat.size_diff / 1024:+9.1f} KiB` {short_location(frame.filename, frame.lineno)} ({stat.count_diff:+} blocks)"
+            )
+
+        embed = discord.Embed(
+            title="🧠 Memory snapshot",
+            description="Top growth since last snapshot:\n" + ("\n".join(lines)[:3900] or "*No change.*"),
+            color=discord.Color.dark_purple()
+        )
+        embed.set_footer(text=f"Traced: {traced / 1024 / 1024:.1f} MiB • Peak: {peak / 1024 / 1024:.1f} MiB")
+
+        report_file = discord.File(io.BytesIO(report.getvalue().encode("utf-8")), filename="memprofile.txt")
+        await interaction.followup.send(embed=embed, file=report_file, ephemeral=True)
+
     @app_commands.command(name="clear_commands", description="(DEV ONLY) 🧹 Clear slash commands from this dev server only.")
     @app_commands.guilds(discord.Object(id=GUILD_ID))
     async def clear_commands(self, interaction: discord.Interaction):
@@ -59,7 +207,7 @@ class DevTools(commands.Cog):
         try:
             guild = discord.Object(id=interaction.guild_id)
             self.bot.tree.clear_commands(guild=guild)
-            await self.bot.tree.sync(guild=guild)
+            await sync_commands(self.bot.tree, guild=guild, force=True)
             await interaction.response.send_message("🧹 Slash commands cleared from this dev server.", ephemeral=True)
         except Exception as e:
             await interaction.response.send_message(f"❌ Failed to clear commands: {e}", ephemeral=True)
@@ -71,11 +219,85 @@ class DevTools(commands.Cog):
 
         try:
             self.bot.tree.clear_commands(guild=None)
-            await self.bot.tree.sync()
+            await sync_commands(self.bot.tree, force=True)
             await interaction.response.send_message("🌍 Cleared all global slash commands.", ephemeral=True)
         except Exception as e:
             await interaction.response.send_message(f"❌ Failed to clear global commands: {e}", ephemeral=True)
 
+    @app_commands.command(name="shards", description="(DEV ONLY) 🧩 Show shard health across all clusters.")
+    async def shards(self, interaction: discord.Interaction):
+        if not self.is_developer(interaction):
+            return await interaction.response.send_message("❌ You are not authorized to use this.", ephemeral=True)
+
+        now = time.time()
+        lines = []
+        for shard_id, cluster_id, pid, latency, guilds, updated_at in get_shard_health():
+            age = now - updated_at
+            state = "❌" if age > STALE_AFTER_SECONDS else "✅"
+            latency_text = "n/a" if latency is None else f"{latency * 1000:.0f}ms"
+            lines.append(
+                f"{state} Shard `{shard_id}` • cluster `{cluster_id}` • pid `{pid}` • "
+                f"`{latency_text}` • {guilds} guild(s) • {age:.0f}s ago"
+            )
+
+        embed = discord.Embed(
+            title="🧩 Shard Health",
+            description="\n".join(lines)[:4000] or "*No shards have reported yet.*",
+            color=discord.Color.green()
+        )
+        embed.set_footer(text=f"Answered by cluster {getattr(self.bot, 'cluster_id', 0)}")
+        await interaction.response.send_message(embed=embed, ephemeral=True)
+
+    @app_commands.command(name="jobs", description="(DEV ONLY) ⏱️ Show scheduled background jobs and their timings.")
+    async def jobs(self, interaction: discord.Interaction):
+        if not self.is_developer(interaction):
+            return await interaction.response.send_message("❌ You are not authorized to use this.", ephemeral=True)
+
+        timings = registry.histograms.get("bot_handler_seconds", {})
+        embed = discord.Embed(title="⏱️ Scheduled Jobs", color=discord.Color.blurple())
+        for name, job in sorted(self.bot.scheduler.jobs.items()):
+            state = "▶️ running" if job.running else ("✅" if job.last_status == "ok" else "❌" if job.last_status else "⏳")
+            lines = [
+                f"Every `{job.interval:.0f}s` • next <t:{int(job.next_run)}:R>" if job.next_run else f"Every `{job.interval:.0f}s`",
+                f"Runs `{job.runs}` • Failures `{job.failures}`",
+            ]
+            if job.last_duration is not None:
+                lines.append(f"Last run `{job.last_duration * 1000:.0f}ms` <t:{int(job.last_started)}:R>")
+            histogram = timings.get((("kind", "job"), ("name", name)))
+            if histogram:
+                lines.append(f"p50 `{histogram.percentile(50) * 1000:.0f}ms` • p95 `{histogram.percentile(95) * 1000:.0f}ms`")
+            if job.last_error:
+                lines.append(f"`{job.last_error[:200]}`")
+            if job.task is None:
+                lines.append("*Unregistered*")
+            embed.add_field(name=f"{state} {name}", value="\n".join(lines), inline=False)
+
+        if not embed.fields:
+            embed.description = "*No jobs registered.*"
+        running = sum(job.running for job in self.bot.scheduler.jobs.values())
+        embed.set_footer(text=f"Cluster {self.bot.scheduler.cluster_id} • {running} running • max {MAX_CONCURRENT_JOBS} at once")
+        await interaction.response.send_message(embed=embed, ephemeral=True)
+
+    @app_commands.command(name="views", description="(DEV ONLY) 🪟 Show how many UI views discord.py is keeping alive.")
+    async def views(self, interaction: discord.Interaction):
+        if not self.is_developer(interaction):
+            return await interaction.response.send_message("❌ You are not authorized to use this.", ephemeral=True)
+
+        report = view_store_report(self.bot)
+        embed = discord.Embed(
+            title="🪟 View Store",
+            description=(
+                f"Messages tracked: `{report['message_entries']}`\n"
+                f"Dispatchable components: `{report['dispatchable_items']}`\n"
+                f"Live message views: `{report['message_views']}`\n"
+                f"Persistent views: `{report['persistent_views']}`\n"
+                f"Open modals: `{report['modals']}`"
+            ),
+            color=discord.Color.blurple()
+        )
+        embed.set_footer(text="Link-only views should be sent with utils.views.link_view and never show up here.")
+        await interaction.response.send_message(embed=embed, ephemeral=True)
+
     @app_commands.command(name="devtest", description="(DEV ONLY) Test if devtools slash commands are registering.")
     async def devtest(self, interaction: discord.Interaction):
         await interaction.response.send_message("✅ Devtools is registering correctly!", ephemeral=True)
@@ -1,13 +1,19 @@
 # cogs/dune_news.py
 
 import discord
-from discord.ext import commands, tasks
+from discord.ext import commands
 from discord import app_commands
-from bs4 import BeautifulSoup
 import aiohttp
-import sqlite3
+import asyncio
+import hashlib
+import logging
 from datetime import datetime
 from database.config_store import get_config
+from database.db import connect, enable_wal, add_missing_columns
+from utils.metrics import db_call
+from utils.singleflight import single_flight
+from utils.views import link_view
+from utils.state_handoff import stash_state, take_state
 
 DB_PATH = "dune_news.sqlite3"
 HEADERS = {
@@ -18,10 +24,28 @@ HEADERS = {
     )
 }
 NEWS_INDEX = "https://duneawakening.com/news"
+# Scrapes are shared between concurrent callers and reused for this long once they finish.
+FETCH_CACHE_SECONDS = 60
+AUTO_POST_INTERVAL_SECONDS = 600
+# Posted articles younger than REVALIDATE_MAX_AGE_DAYS are re-checked for corrections. A changed
+# article edits its message at most once per MIN_EDIT_INTERVAL_SECONDS, and each pass makes at
+# most MAX_EDITS_PER_PASS edits; anything held back is picked up by a later pass.
+REVALIDATE_INTERVAL_SECONDS = 1800
+REVALIDATE_MAX_AGE_DAYS = 14
+REVALIDATE_BATCH = 10
+MIN_EDIT_INTERVAL_SECONDS = 3600
+MAX_EDITS_PER_PASS = 2
+
+log = logging.getLogger(__name__)
+
+# Scrapes can be shared between callers (see single_flight), so they run on this module's own
+# session instead of one a caller owns and could close mid-fetch by being cancelled.
+_session = None
 
 
 def init_db():
-    conn = sqlite3.connect(DB_PATH)
+    enable_wal(DB_PATH)
+    conn = connect(DB_PATH)
     c = conn.cursor()
     c.execute("""
         CREATE TABLE IF NOT EXISTS posted_articles (
@@ -29,12 +53,23 @@ def init_db():
             posted_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
         )
     """)
+    # Older databases only have url and posted_at.
+    add_missing_columns(conn, "posted_articles", {
+        "content_hash": "TEXT",
+        "channel_id": "INTEGER",
+        "message_id": "INTEGER",
+        "etag": "TEXT",
+        "last_modified": "TEXT",
+        "checked_at": "TIMESTAMP",
+        "edited_at": "TIMESTAMP",
+    })
     conn.commit()
     conn.close()
 
 
+@db_call("dune_news")
 def has_been_posted(url):
-    conn = sqlite3.connect(DB_PATH)
+    conn = connect(DB_PATH)
     c = conn.cursor()
     c.execute("SELECT 1 FROM posted_articles WHERE url = ?", (url,))
     result = c.fetchone()
@@ -42,17 +77,87 @@ def has_been_posted(url):
     return result is not None
 
 
-def mark_as_posted(url):
-    conn = sqlite3.connect(DB_PATH)
+@db_call("dune_news")
+def mark_as_posted(url, content_hash=None, channel_id=None, message_id=None):
+    conn = connect(DB_PATH)
+    c = conn.cursor()
+    c.execute(
+        "INSERT OR IGNORE INTO posted_articles (url, content_hash, channel_id, message_id) VALUES (?, ?, ?, ?)",
+        (url, content_hash, channel_id, message_id)
+    )
+    conn.commit()
+    conn.close()
+
+
+@db_call("dune_news")
+def get_articles_to_revalidate(max_age_days: int, limit: int):
+    """Recently posted articles with a known message, least recently checked first."""
+    conn = connect(DB_PATH)
+    c = conn.cursor()
+    c.execute("""
+        SELECT url, content_hash, channel_id, message_id, etag, last_modified,
+               (julianday('now') - julianday(edited_at)) * 86400
+        FROM posted_articles
+        WHERE message_id IS NOT NULL AND posted_at >= datetime('now', ?)
+        ORDER BY checked_at IS NOT NULL, checked_at
+        LIMIT ?
+    """, (f"-{max_age_days} days", limit))
+    rows = c.fetchall()
+    conn.close()
+    return rows
+
+
+@db_call("dune_news")
+def save_article_check(url, content_hash, etag, last_modified, edited=False):
+    conn = connect(DB_PATH)
     c = conn.cursor()
-    c.execute("INSERT OR IGNORE INTO posted_articles (url) VALUES (?)", (url,))
+    c.execute("""
+        UPDATE posted_articles
+        SET content_hash = ?, etag = ?, last_modified = ?, checked_at = CURRENT_TIMESTAMP,
+            edited_at = CASE WHEN ? THEN CURRENT_TIMESTAMP ELSE edited_at END
+        WHERE url = ?
+    """, (content_hash, etag, last_modified, edited, url))
     conn.commit()
     conn.close()
 
 
-async def fetch_html(session, url):
+@db_call("dune_news")
+def forget_article_message(url):
+    """The posted message is gone; stop revalidating the article."""
+    conn = connect(DB_PATH)
+    c = conn.cursor()
+    c.execute("UPDATE posted_articles SET message_id = NULL WHERE url = ?", (url,))
+    conn.commit()
+    conn.close()
+
+
+def parse_html(html):
+    # bs4 is only imported once news is actually fetched, keeping it off the startup path.
+    from bs4 import BeautifulSoup
+
+    return BeautifulSoup(html, "html.parser")
+
+
+def get_session() -> aiohttp.ClientSession:
+    global _session
+    if _session is None or _session.closed:
+        _session = aiohttp.ClientSession()
+    return _session
+
+
+async def close_session():
+    global _session
+    session, _session = _session, None
+    in_flight = [*fetch_news_urls.flight.in_flight.values(), *fetch_article_content.flight.in_flight.values()]
+    if in_flight:
+        await asyncio.wait(in_flight)
+    if session:
+        await session.close()
+
+
+async def fetch_html(url):
     try:
-        async with session.get(url, headers=HEADERS, timeout=aiohttp.ClientTimeout(total=10)) as res:
+        async with get_session().get(url, headers=HEADERS, timeout=aiohttp.ClientTimeout(total=10)) as res:
             if res.status != 200:
                 return None, f"HTTP {res.status} error"
             return await res.text(), None
@@ -60,12 +165,32 @@ async def fetch_html(session, url):
         return None, str(e)
 
 
-async def fetch_news_urls(session, limit=5):
-    html, error = await fetch_html(session, NEWS_INDEX)
+async def fetch_html_if_changed(url, etag=None, last_modified=None):
+    """Conditional GET. Returns (html, etag, last_modified, error); html is None when the page is unchanged (304)."""
+    headers = dict(HEADERS)
+    if etag:
+        headers["If-None-Match"] = etag
+    if last_modified:
+        headers["If-Modified-Since"] = last_modified
+    try:
+        async with get_session().get(url, headers=headers, timeout=aiohttp.ClientTimeout(total=10)) as res:
+            if res.status == 304:
+                return None, etag, last_modified, None
+            if res.status != 200:
+                return None, etag, last_modified, f"HTTP {res.status} error"
+            return await res.text(), res.headers.get("ETag"), res.headers.get("Last-Modified"), None
+    except Exception as e:
+        return None, etag, last_modified, str(e)
+
+
+# Errors aren't cached.
+@single_flight(FETCH_CACHE_SECONDS, key=lambda limit=5: limit, should_cache=lambda result: result[1] is None)
+async def fetch_news_urls(limit=5):
+    html, error = await fetch_html(NEWS_INDEX)
     if error or html is None:
         return [], error or "Failed to fetch news index."
 
-    soup = BeautifulSoup(html, "html.parser")
+    soup = parse_html(html)
     links = soup.find_all("a")
 
     seen = set()
@@ -81,12 +206,16 @@ async def fetch_news_urls(session, limit=5):
     return urls, None if urls else "No articles found."
 
 
-async def fetch_article_content(session, url):
-    html, error = await fetch_html(session, url)
+@single_flight(FETCH_CACHE_SECONDS, key=lambda url: url, should_cache=lambda result: result[-1] is None)
+async def fetch_article_content(url):
+    html, error = await fetch_html(url)
     if error or html is None:
         return "", "", "", None, error
+    return (*parse_article(html), None)
+
 
-    soup = BeautifulSoup(html, "html.parser")
+def parse_article(html):
+    soup = parse_html(html)
     title = soup.find("h1").get_text(strip=True) if soup.find("h1") else "Untitled"
 
     # Get hero image from <meta property="og:image">
@@ -112,7 +241,26 @@ async def fetch_article_content(session, url):
         except Exception:
             published = datetime.utcnow()
 
-    return title, content, image, published, None
+    return title, content, image, published
+
+
+def article_hash(title, content, image):
+    # The publish date is left out: an unparseable one falls back to the current time.
+    return hashlib.sha256("\x1f".join((title, content, image or "")).encode()).hexdigest()
+
+
+def build_article_embed(url, title, content, image, published):
+    embed = discord.Embed(
+        title=title,
+        description=trim_to_paragraph_limit(content),
+        color=0xDEB887,
+        timestamp=published or discord.utils.utcnow(),
+        url=url
+    )
+    if image:
+        embed.set_image(url=image)
+    embed.set_footer(text="Dune: Awakening News")
+    return embed
 
 
 def trim_to_paragraph_limit(text, limit=1800):
@@ -145,24 +293,36 @@ def summarize_by_word_limit(text, word_limit=100):
     return result.strip()
 
 
-class ReadMoreView(discord.ui.View):
-    def __init__(self, url):
-        super().__init__(timeout=None)
-        self.add_item(discord.ui.Button(label="📖 Read Full Article", url=url))
-
-
 class DuneNews(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
         init_db()
-        self.auto_post_news.start()
+        state = take_state(bot, "dune_news")
+        if state:
+            self.import_state(state)
+
+    async def cog_load(self):
+        self.bot.scheduler.register("dune_news.auto_post", self.auto_post_news, AUTO_POST_INTERVAL_SECONDS)
+        self.bot.scheduler.register("dune_news.revalidate", self.revalidate_articles, REVALIDATE_INTERVAL_SECONDS)
+
+    async def cog_unload(self):
+        stash_state(self.bot, "dune_news", self.export_state())
+        self.bot.scheduler.unregister("dune_news.auto_post")
+        self.bot.scheduler.unregister("dune_news.revalidate")
+        await close_session()
+
+    def export_state(self) -> dict:
+        return {
+            "news_urls": fetch_news_urls.flight.results,
+            "articles": fetch_article_content.flight.results,
+        }
+
+    def import_state(self, state: dict):
+        # The reloaded module starts with empty scrape caches; carry the warm ones over.
+        fetch_news_urls.flight.results.update(state["news_urls"])
+        fetch_article_content.flight.results.update(state["articles"])
 
-    def cog_unload(self):
-        self.auto_post_news.cancel()
-
-    @tasks.loop(minutes=10)
     async def auto_post_news(self):
-        await self.bot.wait_until_ready()
         channel_id = get_config("dune_news_channel_id")
         if not channel_id:
             return
@@ -170,104 +330,128 @@ class DuneNews(commands.Cog):
         if not isinstance(channel, discord.TextChannel):
             return
 
-        async with aiohttp.ClientSession() as session:
-            urls, err = await fetch_news_urls(session, limit=5)
-            if err or not urls:
-                return
+        urls, err = await fetch_news_urls(limit=5)
+        if err or not urls:
+            return
 
-            for url in urls:
-                if has_been_posted(url):
-                    continue
+        for url in urls:
+            if has_been_posted(url):
+                continue
 
-                title, content, image, published, error = await fetch_article_content(session, url)
-                if error or not content:
-                    continue
+            title, content, image, published, error = await fetch_article_content(url)
+            if error or not content:
+                continue
 
-                display_text = trim_to_paragraph_limit(content)
+            embed = build_article_embed(url, title, content, image, published)
+            message = await channel.send(embed=embed, view=link_view(("📖 Read Full Article", url)))
+            mark_as_posted(url, article_hash(title, content, image), channel.id, message.id)
+            break
 
-                embed = discord.Embed(
-                    title=title,
-                    description=display_text,
-                    color=0xDEB887,
-                    timestamp=published or discord.utils.utcnow(),
-                    url=url
-                )
-                if image:
-                    embed.set_image(url=image)
-                embed.set_footer(text="Dune: Awakening News")
+    async def revalidate_articles(self):
+        # In cluster mode every worker registers this job; only the one holding the news channel
+        # runs it, so the site is fetched once per pass and no other worker writes these rows.
+        news_channel = self.bot.get_channel(get_config("dune_news_channel_id") or 0)
+        if not isinstance(news_channel, discord.TextChannel):
+            return
 
-                await channel.send(embed=embed, view=ReadMoreView(url))
-                mark_as_posted(url)
-                break
+        rows = get_articles_to_revalidate(REVALIDATE_MAX_AGE_DAYS, REVALIDATE_BATCH)
+        if not rows:
+            return
 
-    @auto_post_news.before_loop
-    async def before_auto_post(self):
-        await self.bot.wait_until_ready()
+        # Every path stamps checked_at, even when nothing is saved, so articles that keep failing
+        # rotate to the back of the queue instead of filling every batch.
+        edits = 0
+        for url, old_hash, channel_id, message_id, etag, last_modified, since_edit in rows:
+            # Resolved before fetching: a post whose channel is gone can't be edited anyway.
+            channel = self.bot.get_channel(channel_id)
+            if not isinstance(channel, discord.TextChannel):
+                save_article_check(url, old_hash, etag, last_modified)
+                continue
+
+            html, new_etag, new_last_modified, error = await fetch_html_if_changed(url, etag, last_modified)
+            if error or html is None:
+                save_article_check(url, old_hash, etag, last_modified)
+                continue
+
+            title, content, image, published = parse_article(html)
+            new_hash = article_hash(title, content, image)
+            if not content or new_hash == old_hash:
+                save_article_check(url, old_hash, new_etag, new_last_modified)
+                continue
+
+            # Held-back edits keep the old hash and validators, so the next pass sees the change again
+            # instead of a 304.
+            if edits >= MAX_EDITS_PER_PASS or (since_edit is not None and since_edit < MIN_EDIT_INTERVAL_SECONDS):
+                save_article_check(url, old_hash, etag, last_modified)
+                continue
+            try:
+                await channel.get_partial_message(message_id).edit(
+                    embed=build_article_embed(url, title, content, image, published),
+                    view=link_view(("📖 Read Full Article", url))
+                )
+            except discord.NotFound:
+                forget_article_message(url)
+                continue
+            except discord.HTTPException as e:
+                log.warning("Failed to update the post for %s: %s", url, e)
+                save_article_check(url, old_hash, etag, last_modified)
+                continue
+
+            save_article_check(url, new_hash, new_etag, new_last_modified, edited=True)
+            fetch_article_content.flight.results.pop(url, None)
+            edits += 1
+            log.info("📝 Updated the post for %s after the article changed", url)
 
     @app_commands.command(name="dune_news", description="Get the latest Dune: Awakening newsletter.")
     async def dune_news(self, interaction: discord.Interaction):
         await interaction.response.defer()
-        async with aiohttp.ClientSession() as session:
-            urls, err = await fetch_news_urls(session)
-            if err or not urls:
-                return await interaction.followup.send(f"❌ {err or 'No news found.'}")
-
-            for url in urls:
-                title, content, image, published, error = await fetch_article_content(session, url)
-                if error or not content:
-                    continue
-
-                display_text = trim_to_paragraph_limit(content)
-
-                embed = discord.Embed(
-                    title=title,
-                    description=display_text,
-                    color=0xDEB887,
-                    timestamp=published or discord.utils.utcnow(),
-                    url=url
-                )
-                if image:
-                    embed.set_image(url=image)
-                embed.set_footer(text="Dune: Awakening News")
+        urls, err = await fetch_news_urls()
+        if err or not urls:
+            return await interaction.followup.send(f"❌ {err or 'No news found.'}")
+
+        for url in urls:
+            title, content, image, published, error = await fetch_article_content(url)
+            if error or not content:
+                continue
 
-                return await interaction.followup.send(embed=embed, view=ReadMoreView(url))
+            embed = build_article_embed(url, title, content, image, published)
+            return await interaction.followup.send(embed=embed, view=link_view(("📖 Read Full Article", url)))
 
-            await interaction.followup.send("❌ Could not fetch any valid news posts.")
+        await interaction.followup.send("❌ Could not fetch any valid news posts.")
 
     @app_commands.command(name="dune_news_summary", description="Summarize the last 3 Dune: Awakening posts.")
     async def dune_news_summary(self, interaction: discord.Interaction):
         await interaction.response.defer()
-        async with aiohttp.ClientSession() as session:
-            urls, err = await fetch_news_urls(session)
-            if err or not urls:
-                return await interaction.followup.send(f"❌ {err or 'No news found.'}")
-
-            sent = 0
-            for url in urls:
-                title, content, image, published, error = await fetch_article_content(session, url)
-                if error or not content:
-                    continue
-
-                summary = summarize_by_word_limit(content)
-
-                embed = discord.Embed(
-                    title=title,
-                    description=summary,
-                    color=discord.Color.dark_gold(),
-                    timestamp=published or discord.utils.utcnow(),
-                    url=url
-                )
-                if image:
-                    embed.set_image(url=image)
-                embed.set_footer(text="Dune: Awakening News")
-
-                await interaction.followup.send(embed=embed, view=ReadMoreView(url))
-                sent += 1
-                if sent >= 3:
-                    break
+        urls, err = await fetch_news_urls()
+        if err or not urls:
+            return await interaction.followup.send(f"❌ {err or 'No news found.'}")
+
+        sent = 0
+        for url in urls:
+            title, content, image, published, error = await fetch_article_content(url)
+            if error or not content:
+                continue
+
+            summary = summarize_by_word_limit(content)
+
+            embed = discord.Embed(
+                title=title,
+                description=summary,
+                color=discord.Color.dark_gold(),
+                timestamp=published or discord.utils.utcnow(),
+                url=url
+            )
+            if image:
+                embed.set_image(url=image)
+            embed.set_footer(text="Dune: Awakening News")
+
+            await interaction.followup.send(embed=embed, view=link_view(("📖 Read Full Article", url)))
+            sent += 1
+            if sent >= 3:
+                break
 
-            if sent == 0:
-                await interaction.followup.send("❌ No valid summaries found.")
+        if sent == 0:
+            await interaction.followup.send("❌ No valid summaries found.")
 
 
 async def setup(bot):
@@ -1,16 +1,23 @@
 # cogs/reddit_mirror.py
 
 import discord
-from discord.ext import commands, tasks
-import praw
+from discord.ext import commands
 import os
+import logging
 from dotenv import load_dotenv
 
 from discord import app_commands
 from database.config_store import get_config, set_config
+from utils.reddit_client import InstrumentedReddit, DEFAULT_LOW_WATER
+from utils.reddit_media import MediaResolver, DEFAULT_MAX_WIDTH
+from utils.state_handoff import stash_state, take_state
+
+CHECK_INTERVAL_SECONDS = 90
 
 load_dotenv()
 
+log = logging.getLogger(__name__)
+
 
 class RedditGalleryView(discord.ui.View):
     def __init__(self, images: list[str], embed: discord.Embed, author_tag: str):
@@ -39,49 +46,74 @@ class RedditGalleryView(discord.ui.View):
 
 
 class RedditMirror(commands.Cog):
-    def __init__(self, bot):
+    def __init__(self, bot, reddit=None):
         self.bot = bot
         self.subreddit_name = os.getenv("REDDIT_SUBREDDIT")
         self.channel_id = int(os.getenv("REDDIT_CHANNEL_ID"))
         self.default_min_upvotes = 20
 
-        try:
-            self.reddit = praw.Reddit(
-                client_id=os.getenv("REDDIT_CLIENT_ID"),
-                client_secret=os.getenv("REDDIT_CLIENT_SECRET"),
-                username=os.getenv("REDDIT_USERNAME"),
-                password=os.getenv("REDDIT_PASSWORD"),
-                user_agent=os.getenv("REDDIT_USER_AGENT")
-            )
-        except Exception as e:
-            print(f"[RedditMirror] PRAW initialization failed: {e}")
-            self.reddit = None
+        # `reddit` lets tools/reddit_replay.py swap in an offline stand-in for PRAW.
+        # Otherwise the client (and the praw import) waits until the mirror is first used.
+        self.reddit = InstrumentedReddit(reddit) if reddit is not None else None
+        self.reddit_init_failed = False
 
         self.posted_ids = set()
-        self.check_reddit.start()
+        self.media = MediaResolver()
+        state = take_state(bot, "reddit_mirror")
+        if state:
+            self.import_state(state)
+
+    async def cog_load(self):
+        # The scheduler keeps the next run time across reloads and restarts; see utils/scheduler.py
+        self.bot.scheduler.register("reddit_mirror.check", self.check_reddit, CHECK_INTERVAL_SECONDS)
 
     def cog_unload(self):
-        self.check_reddit.cancel()
+        stash_state(self.bot, "reddit_mirror", self.export_state())
+        self.bot.scheduler.unregister("reddit_mirror.check")
 
-    def get_min_upvotes(self):
-        return get_config("reddit_min_upvotes") or self.default_min_upvotes
+    def export_state(self) -> dict:
+        return {"posted_ids": self.posted_ids, "reddit": self.reddit, "media": self.media}
+
+    def import_state(self, state: dict):
+        # Keeping the client keeps its rate-limit budget and stats; keeping posted_ids prevents reposts.
+        self.posted_ids = state["posted_ids"]
+        self.reddit = self.reddit or state["reddit"]
+        # Stashed by an instance from before the media cache existed when a reload deploys it.
+        self.media = state.get("media") or self.media
 
-    def extract_gallery_images(self, submission) -> list[str]:
-        images = []
-        if hasattr(submission, "media_metadata"):
+    def get_reddit(self):
+        if self.reddit is None and not self.reddit_init_failed:
             try:
-                for item in submission.gallery_data["items"]:
-                    media_id = item["media_id"]
-                    meta = submission.media_metadata[media_id]
-                    url = meta["s"]["u"].replace("&amp;", "&")
-                    images.append(url)
+                import praw
+
+                self.reddit = InstrumentedReddit(praw.Reddit(
+                    client_id=os.getenv("REDDIT_CLIENT_ID"),
+                    client_secret=os.getenv("REDDIT_CLIENT_SECRET"),
+                    username=os.getenv("REDDIT_USERNAME"),
+                    password=os.getenv("REDDIT_PASSWORD"),
+                    user_agent=os.getenv("REDDIT_USER_AGENT")
+                ))
             except Exception as e:
-                print(f"[RedditMirror] Failed to parse gallery: {e}")
-        return images
+                log.error("PRAW initialization failed: %s", e)
+                self.reddit_init_failed = True
+        return self.reddit
+
+    def get_min_upvotes(self):
+        return get_config("reddit_min_upvotes") or self.default_min_upvotes
+
+    def refresh_budget_floor(self):
+        self.reddit.low_water = get_config("reddit_budget_floor") or DEFAULT_LOW_WATER
+
+    def resolve_media(self, submission):
+        max_width = get_config("reddit_preview_max_width") or DEFAULT_MAX_WIDTH
+        try:
+            return self.media.resolve(submission, max_width)
+        except Exception as e:
+            log.warning("Failed to resolve media for %s: %s", submission.id, e)
+            return None
 
-    def create_embed_from_submission(self, submission, image_override=None):
+    def create_embed_from_submission(self, submission, media=None, image_override=None):
         title = submission.title
-        url = submission.url
         post_url = f"https://reddit.com{submission.permalink}"
 
         embed = discord.Embed(
@@ -97,28 +129,39 @@ class RedditMirror(commands.Cog):
 
         if image_override:
             embed.set_image(url=image_override)
-        elif url.lower().endswith((".jpg", ".png", ".gif", ".jpeg", ".webp")):
-            embed.set_image(url=url)
+        elif media and media.image:
+            embed.set_image(url=media.image)
+
+        # Embeds can't play video, so show the poster frame and point at the post.
+        if media and media.video_url:
+            embed.add_field(name="🎬 Video", value=f"[Watch on Reddit]({post_url})", inline=False)
 
         return embed
 
-    @tasks.loop(minutes=1.5)
     async def check_reddit(self):
         if not get_config("reddit_enabled"):
             return
 
-        if self.reddit is None:
+        # Resolve the channel first: in cluster mode only the worker holding its guild should poll.
+        channel = self.bot.get_channel(self.channel_id)
+        if channel is None or not isinstance(channel, discord.TextChannel):
             return
 
-        try:
-            subreddit = self.reddit.subreddit(self.subreddit_name)
-            submissions = list(subreddit.new(limit=5))
-        except Exception as e:
-            print(f"[RedditMirror] Failed to fetch subreddit posts: {e}")
+        if self.get_reddit() is None:
             return
 
-        channel = self.bot.get_channel(self.channel_id)
-        if channel is None or not isinstance(channel, discord.TextChannel):
+        self.refresh_budget_floor()
+        if self.reddit.should_skip_poll():
+            log.warning(
+                "Skipping poll, %s request(s) left until reset in %.0fs",
+                self.reddit.remaining, self.reddit.seconds_until_reset()
+            )
+            return
+
+        try:
+            submissions = await self.reddit.fetch_new(self.subreddit_name, limit=5, endpoint="check_reddit")
+        except Exception as e:
+            log.warning("Failed to fetch subreddit posts: %s", e)
             return
 
         min_upvotes = self.get_min_upvotes()
@@ -131,52 +174,55 @@ class RedditMirror(commands.Cog):
 
             self.posted_ids.add(submission.id)
 
-            if getattr(submission, "is_gallery", False):
-                images = self.extract_gallery_images(submission)
-                if not images:
-                    continue
-                embed = self.create_embed_from_submission(submission, image_override=images[0])
-                view = RedditGalleryView(images, embed, f"Posted by u/{submission.author}")
+            media = self.resolve_media(submission)
+            if media and media.gallery:
+                embed = self.create_embed_from_submission(submission, media, image_override=media.gallery[0])
+                view = RedditGalleryView(media.gallery, embed, f"Posted by u/{submission.author}")
                 try:
                     await channel.send(embed=embed, view=view)
                 except Exception as e:
-                    print(f"[RedditMirror] Failed to send gallery post {submission.id}: {e}")
+                    log.warning("Failed to send gallery post %s: %s", submission.id, e)
+            elif getattr(submission, "is_gallery", False):
+                continue
             else:
-                embed = self.create_embed_from_submission(submission)
+                embed = self.create_embed_from_submission(submission, media)
                 try:
                     await channel.send(embed=embed)
                 except Exception as e:
-                    print(f"[RedditMirror] Failed to send embed for {submission.id}: {e}")
-
-    @check_reddit.before_loop
-    async def before_check_reddit(self):
-        await self.bot.wait_until_ready()
+                    log.warning("Failed to send embed for %s: %s", submission.id, e)
 
     @app_commands.command(name="reddit_latest", description="Post the latest Reddit post that meets the upvote threshold.")
     async def reddit_latest(self, interaction: discord.Interaction):
         await interaction.response.defer()
 
-        if self.reddit is None:
+        if self.get_reddit() is None:
             await interaction.followup.send("❌ Reddit API not initialized.")
             return
 
-        subreddit = self.reddit.subreddit(self.subreddit_name)
+        self.refresh_budget_floor()
+        if self.reddit.is_low():
+            await interaction.followup.send(
+                f"⏳ Reddit rate limit is nearly used up. Try again in {self.reddit.seconds_until_reset():.0f}s."
+            )
+            return
+
         min_upvotes = self.get_min_upvotes()
 
         try:
-            for submission in subreddit.new(limit=10):
+            submissions = await self.reddit.fetch_new(self.subreddit_name, limit=10, endpoint="reddit_latest")
+            for submission in submissions:
                 if submission.score < min_upvotes:
                     continue
 
-                if getattr(submission, "is_gallery", False):
-                    images = self.extract_gallery_images(submission)
-                    if not images:
-                        continue
-                    embed = self.create_embed_from_submission(submission, image_override=images[0])
-                    view = RedditGalleryView(images, embed, f"Posted by u/{submission.author}")
+                media = self.resolve_media(submission)
+                if media and media.gallery:
+                    embed = self.create_embed_from_submission(submission, media, image_override=media.gallery[0])
+                    view = RedditGalleryView(media.gallery, embed, f"Posted by u/{submission.author}")
                     await interaction.followup.send(embed=embed, view=view)
+                elif getattr(submission, "is_gallery", False):
+                    continue
                 else:
-                    embed = self.create_embed_from_submission(submission)
+                    embed = self.create_embed_from_submission(submission, media)
                     await interaction.followup.send(embed=embed)
                 return
 
@@ -184,6 +230,43 @@ class RedditMirror(commands.Cog):
         except Exception as e:
             await interaction.followup.send(f"❌ Failed to fetch Reddit posts: {e}")
 
+    @app_commands.command(name="reddit_stats", description="(ADMIN ONLY) Show Reddit API usage and rate limit budget.")
+    @app_commands.checks.has_permissions(administrator=True)
+    async def reddit_stats(self, interaction: discord.Interaction):
+        # The client is built lazily, so it may not exist yet on a healthy bot that hasn't polled.
+        if self.get_reddit() is None:
+            await interaction.response.send_message("❌ Reddit API not initialized.", ephemeral=True)
+            return
+
+        api = self.reddit
+        embed = discord.Embed(title="📡 Reddit API Usage", color=discord.Color.orange())
+
+        remaining = "unknown" if api.remaining is None else f"{api.remaining:.0f}"
+        used = "unknown" if api.used is None else str(api.used)
+        embed.add_field(
+            name="Budget",
+            value=(
+                f"Remaining: `{remaining}` • Used: `{used}`\n"
+                f"Resets in: `{api.seconds_until_reset():.0f}s` • Floor: `{api.low_water}`\n"
+                f"Skipped polls: `{api.skipped_polls}`"
+            ),
+            inline=False
+        )
+
+        for endpoint, stats in sorted(api.endpoints.items()):
+            value = (
+                f"Requests: `{stats.calls}` • Errors: `{stats.errors}`\n"
+                f"Latency avg/max: `{stats.avg_seconds * 1000:.0f}ms` / `{stats.max_seconds * 1000:.0f}ms`"
+            )
+            if stats.last_error:
+                value += f"\nLast error: `{stats.last_error[:200]}`"
+            embed.add_field(name=endpoint, value=value, inline=False)
+
+        if not api.endpoints:
+            embed.description = "No Reddit requests made yet."
+
+        await interaction.response.send_message(embed=embed, ephemeral=True)
+
 
 async def setup(bot):
     await bot.add_cog(RedditMirror(bot))
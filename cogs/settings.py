@@ -23,10 +23,15 @@ class Settings(commands.Cog):
             "welcome_channel_id": "Welcome Channel",
             "welcome_enabled": "Welcome Messages",
             "voice_entry_channel_id": "Join-to-Create Channel",
+            "voice_pool_size": "Temp VC Pool Size",
             "reddit_channel_id": "Reddit Mirror Channel",
             "reddit_enabled": "Reddit Mirror",
             "reddit_min_upvotes": "Reddit Min Upvotes",
-            "dune_news_channel_id": "Dune News Channel"
+            "reddit_budget_floor": "Reddit Rate Limit Floor",
+            "reddit_preview_max_width": "Reddit Preview Max Width",
+            "dune_news_channel_id": "Dune News Channel",
+            "backup_interval_hours": "Backup Interval (hours)",
+            "backup_keep": "Backups Kept"
         }
 
         embed = discord.Embed(
@@ -1,23 +1,371 @@
 # cogs/voice_manager.py
 
 import discord
-from discord.ext import commands, tasks
+from discord.ext import commands
 from discord import app_commands
-from database.config_store import get_config, set_config
+from database.config_store import get_config, set_config, add_config_listener, remove_config_listener
+from database.voice_store import (
+    init_voice_db, add_temp_channel, set_temp_channel_owner, remove_temp_channel, get_temp_channels
+)
 import asyncio
+import logging
 import time
 
+from utils.state_handoff import stash_state, take_state
+
 CHANNEL_TIMEOUT_SECONDS = 5  # seconds before deleting empty temp VC
+POOL_CHANNEL_NAME = "Spare Channel"
+POOL_REFILL_DELAY_SECONDS = 2  # spacing between pool creates so we stay clear of the channel-create limit
+RENAME_COOLDOWN_SECONDS = 300  # Discord allows 2 renames per channel per 10 minutes
+
+log = logging.getLogger(__name__)
+
+
+class TempChannelRegistry:
+    """Two-way index of temp VCs and their owners, mirrored to the temp_voice_channels table.
+
+    Channels with no owner are pre-created, hidden pool channels waiting to be claimed.
+    """
+
+    def __init__(self):
+        self.owner_by_channel = {}  # {channel_id: (guild_id, owner_id)}
+        self.channel_by_owner = {}  # {(guild_id, owner_id): channel_id}
+        self.pool = {}  # {guild_id: [channel_id, ...]}
+
+    def load(self, rows=None):
+        """Index (channel_id, guild_id, owner_id) rows, read from the database unless given."""
+        self.owner_by_channel.clear()
+        self.channel_by_owner.clear()
+        self.pool.clear()
+        for channel_id, guild_id, owner_id in get_temp_channels() if rows is None else rows:
+            self._index(channel_id, guild_id, owner_id)
+
+    def _index(self, channel_id: int, guild_id: int, owner_id):
+        self.owner_by_channel[channel_id] = (guild_id, owner_id)
+        if owner_id is None:
+            self.pool.setdefault(guild_id, []).append(channel_id)
+        else:
+            self.channel_by_owner[(guild_id, owner_id)] = channel_id
+
+    def _unindex(self, channel_id: int):
+        guild_id, owner_id = self.owner_by_channel.pop(channel_id)
+        if owner_id is None:
+            self.pool[guild_id].remove(channel_id)
+        elif self.channel_by_owner.get((guild_id, owner_id)) == channel_id:
+            del self.channel_by_owner[(guild_id, owner_id)]
+        return guild_id
+
+    def add(self, channel_id: int, guild_id: int, owner_id):
+        add_temp_channel(channel_id, guild_id, owner_id)
+        self._index(channel_id, guild_id, owner_id)
+
+    def set_owner(self, channel_id: int, owner_id):
+        guild_id = self._unindex(channel_id)
+        set_temp_channel_owner(channel_id, owner_id)
+        self._index(channel_id, guild_id, owner_id)
+
+    def remove(self, channel_id: int):
+        if channel_id not in self.owner_by_channel:
+            return
+        self._unindex(channel_id)
+        remove_temp_channel(channel_id)
+
+    def forget(self, channel_id: int):
+        """Drop a channel from memory only, leaving its row for whichever worker owns the guild."""
+        if channel_id in self.owner_by_channel:
+            self._unindex(channel_id)
+
+    def is_temp(self, channel_id: int) -> bool:
+        return channel_id in self.owner_by_channel
+
+    def is_owned(self, channel_id: int) -> bool:
+        entry = self.owner_by_channel.get(channel_id)
+        return entry is not None and entry[1] is not None
+
+    def channel_for(self, guild_id: int, owner_id: int):
+        return self.channel_by_owner.get((guild_id, owner_id))
+
+    def pooled(self, guild_id: int) -> list:
+        return self.pool.get(guild_id, [])
 
 
 class VoiceManager(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
-        self.temp_channels = {}  # {channel_id: empty_timestamp}
-        self.cleanup_task.start()
+        init_voice_db()
+        self.registry = TempChannelRegistry()
+        self.expiry_timers = {}  # {channel_id: asyncio.Task}
+        self.expiry_due = {}  # {channel_id: monotonic time the timer fires}
+        self.refill_tasks = {}  # {guild_id: asyncio.Task}
+        self.renamed_at = {}  # {channel_id: monotonic time of last rename}
+        self.join_flights = {}  # {(guild_id, member_id): asyncio.Task}
+        self.join_retriggered = set()  # flights that saw another entry event while running
+        self.reconcile_task = None
+
+    async def cog_load(self):
+        state = take_state(self.bot, "voice_manager")
+        if state:
+            self.import_state(state)
+        else:
+            self.registry.load()
+        self.reconcile_task = asyncio.create_task(self.reconcile_registry())
+        add_config_listener(self.on_config_change)
 
     def cog_unload(self):
-        self.cleanup_task.cancel()
+        remove_config_listener(self.on_config_change)
+        stash_state(self.bot, "voice_manager", self.export_state())
+        if self.reconcile_task:
+            self.reconcile_task.cancel()
+        for task in [*self.expiry_timers.values(), *self.refill_tasks.values(), *self.join_flights.values()]:
+            task.cancel()
+        self.expiry_timers.clear()
+        self.expiry_due.clear()
+        self.refill_tasks.clear()
+        self.join_flights.clear()
+
+    def export_state(self) -> dict:
+        now = time.monotonic()
+        return {
+            "channels": [
+                (channel_id, guild_id, owner_id)
+                for channel_id, (guild_id, owner_id) in self.registry.owner_by_channel.items()
+            ],
+            "renamed_at": dict(self.renamed_at),
+            "expiry_remaining": {channel_id: max(0.0, due - now) for channel_id, due in self.expiry_due.items()},
+        }
+
+    def import_state(self, state: dict):
+        self.registry.load(state["channels"])
+        self.renamed_at = state["renamed_at"]
+        # Pending deletions keep their original deadline rather than restarting the countdown.
+        for channel_id, remaining in state["expiry_remaining"].items():
+            self.schedule_expiry(channel_id, remaining)
+
+    def get_pool_size(self) -> int:
+        return get_config("voice_pool_size") or 0
+
+    def on_config_change(self, key: str):
+        # Otherwise a resized pool would only grow or shrink after the next claim or restart.
+        if key in ("voice_pool_size", "voice_entry_channel_id"):
+            self.bot.loop.call_soon_threadsafe(self.refill_entry_category)
+
+    # ───── EXPIRY TIMERS ─────────────────────────────────
+
+    def schedule_expiry(self, channel_id: int, delay: float = CHANNEL_TIMEOUT_SECONDS):
+        self.cancel_expiry(channel_id)
+        self.expiry_due[channel_id] = time.monotonic() + delay
+        self.expiry_timers[channel_id] = asyncio.create_task(self.expire_channel(channel_id, delay))
+
+    def cancel_expiry(self, channel_id: int):
+        self.expiry_due.pop(channel_id, None)
+        timer = self.expiry_timers.pop(channel_id, None)
+        if timer:
+            timer.cancel()
+
+    async def expire_channel(self, channel_id: int, delay: float = CHANNEL_TIMEOUT_SECONDS):
+        try:
+            await asyncio.sleep(delay)
+            channel = self.bot.get_channel(channel_id)
+            if channel is None:
+                self.registry.remove(channel_id)
+            elif isinstance(channel, discord.VoiceChannel) and len(channel.members) == 0:
+                await self.return_to_pool(channel)
+        finally:
+            if self.expiry_timers.get(channel_id) is asyncio.current_task():
+                del self.expiry_timers[channel_id]
+                self.expiry_due.pop(channel_id, None)
+
+    async def delete_temp_channel(self, channel: discord.VoiceChannel, reason: str):
+        try:
+            await channel.delete(reason=reason)
+            self.registry.remove(channel.id)
+        except discord.NotFound:
+            self.registry.remove(channel.id)
+        except Exception as e:
+            log.warning("Failed to delete channel %s: %s", channel.id, e)
+
+    async def reconcile_registry(self):
+        """Drop temp VCs deleted while the bot was offline and start timers for ones left empty."""
+        await self.bot.wait_until_ready()
+
+        for channel_id, (guild_id, _) in list(self.registry.owner_by_channel.items()):
+            if self.bot.get_guild(guild_id) is None:
+                # Guild is on another cluster worker (or gone); leave its rows to that worker.
+                self.registry.forget(channel_id)
+                continue
+            channel = self.bot.get_channel(channel_id)
+            if channel is None:
+                self.registry.remove(channel_id)
+            elif not self.registry.is_owned(channel_id):
+                continue
+            elif len(channel.members) == 0 and channel_id not in self.expiry_timers:
+                self.schedule_expiry(channel_id)
+
+        self.refill_entry_category()
+
+    # ───── CHANNEL POOL ──────────────────────────────────
+
+    def refill_entry_category(self):
+        entry_channel = self.bot.get_channel(get_config("voice_entry_channel_id") or 0)
+        if entry_channel and entry_channel.category:
+            self.schedule_refill(entry_channel.category)
+
+    def hidden_overwrites(self, guild: discord.Guild) -> dict:
+        return {
+            guild.default_role: discord.PermissionOverwrite(view_channel=False, connect=False),
+            guild.me: discord.PermissionOverwrite(view_channel=True, connect=True, manage_channels=True, move_members=True)
+        }
+
+    def owner_overwrites(self, member: discord.Member) -> dict:
+        return {
+            member.guild.default_role: discord.PermissionOverwrite(connect=True, view_channel=True),
+            member: discord.PermissionOverwrite(manage_channels=True, connect=True, view_channel=True)
+        }
+
+    def schedule_refill(self, category: discord.CategoryChannel):
+        task = self.refill_tasks.get(category.guild.id)
+        if task and not task.done():
+            return
+        self.refill_tasks[category.guild.id] = asyncio.create_task(self.refill_pool(category))
+
+    async def refill_pool(self, category: discord.CategoryChannel):
+        guild = category.guild
+        while len(self.registry.pooled(guild.id)) < self.get_pool_size():
+            try:
+                channel = await category.create_voice_channel(
+                    name=POOL_CHANNEL_NAME,
+                    overwrites=self.hidden_overwrites(guild),
+                    reason="Pre-warming temp VC pool"
+                )
+            except Exception as e:
+                log.warning("Failed to create pool channel: %s", e)
+                return
+            self.registry.add(channel.id, guild.id, None)
+            await asyncio.sleep(POOL_REFILL_DELAY_SECONDS)
+
+        # voice_pool_size may have been lowered, or concurrent returns may have overshot it.
+        for channel_id in self.registry.pooled(guild.id)[self.get_pool_size():]:
+            channel = guild.get_channel(channel_id)
+            if channel is None:
+                self.registry.remove(channel_id)
+            elif not self.registry.is_owned(channel_id):
+                # Out of the pool before the await so a concurrent claim can't pick it mid-delete.
+                self.registry.remove(channel_id)
+                try:
+                    await channel.delete(reason="Shrinking temp VC pool")
+                except discord.NotFound:
+                    pass
+                except Exception as e:
+                    log.warning("Failed to delete pool channel %s: %s", channel_id, e)
+                    self.registry.add(channel_id, guild.id, None)
+
+    async def claim_pooled_channel(self, member: discord.Member, category: discord.CategoryChannel):
+        """Turn a pooled channel into the member's temp VC with a single edit, or return None."""
+        name = f"{member.display_name}'s Channel"
+        now = time.monotonic()
+
+        for channel_id in list(self.registry.pooled(member.guild.id)):
+            channel = member.guild.get_channel(channel_id)
+            if channel is None:
+                self.registry.remove(channel_id)
+                continue
+            if channel.category_id != category.id:
+                continue
+
+            rename = channel.name != name
+            if rename and now - self.renamed_at.get(channel_id, -RENAME_COOLDOWN_SECONDS) < RENAME_COOLDOWN_SECONDS:
+                continue  # renaming again now would hit Discord's rename limit and stall the join
+
+            self.registry.set_owner(channel_id, member.id)
+            try:
+                if rename:
+                    await channel.edit(name=name, overwrites=self.owner_overwrites(member))
+                    self.renamed_at[channel_id] = now
+                else:
+                    await channel.edit(overwrites=self.owner_overwrites(member))
+            except discord.NotFound:
+                self.registry.remove(channel_id)
+                continue
+            except Exception as e:
+                # The edit didn't apply, so the channel is still a hidden spare; keep it pooled.
+                log.warning("Failed to claim pool channel %s: %s", channel_id, e)
+                self.registry.set_owner(channel_id, None)
+                continue
+            return channel
+
+        return None
+
+    async def return_to_pool(self, channel: discord.VoiceChannel):
+        """Hide an empty temp VC as a spare, or delete it if the pool is already full."""
+        if len(self.registry.pooled(channel.guild.id)) >= self.get_pool_size():
+            await self.delete_temp_channel(channel, "Temporary VC expired")
+            return
+        # Only the overwrites change; the name is left as-is so claims don't burn the rename limit twice.
+        try:
+            await channel.edit(overwrites=self.hidden_overwrites(channel.guild))
+            self.registry.set_owner(channel.id, None)
+        except Exception as e:
+            log.warning("Failed to return channel %s to pool: %s", channel.id, e)
+            return
+        if channel.category:
+            self.schedule_refill(channel.category)
+
+    # ───── JOIN-TO-CREATE ────────────────────────────────
+
+    async def run_join_flight(self, member: discord.Member):
+        """One create/move per member at a time.
+
+        Entry events that arrive while this runs only mark it for one more pass against the
+        member's latest voice state, so rapid rejoins collapse instead of racing each other.
+        """
+        key = (member.guild.id, member.id)
+        try:
+            while True:
+                self.join_retriggered.discard(key)
+
+                entry_channel_id = get_config("voice_entry_channel_id")
+                voice = member.voice
+                if not voice or not voice.channel or voice.channel.id != entry_channel_id:
+                    break
+
+                await self.move_to_temp_channel(member, voice.channel.category)
+
+                if key not in self.join_retriggered:
+                    break
+        finally:
+            self.join_flights.pop(key, None)
+
+    async def move_to_temp_channel(self, member: discord.Member, category: discord.CategoryChannel):
+        existing_id = self.registry.channel_for(member.guild.id, member.id)
+        channel = member.guild.get_channel(existing_id) if existing_id else None
+        if channel is None:
+            if existing_id:
+                self.registry.remove(existing_id)
+
+            channel = await self.claim_pooled_channel(member, category)
+            # Also after a miss: the pool may be empty because voice_pool_size was just raised.
+            self.schedule_refill(category)
+            if channel is None:
+                # This runs in a join flight task, not the listener, so failures are logged here.
+                try:
+                    channel = await category.create_voice_channel(
+                        name=f"{member.display_name}'s Channel",
+                        overwrites=self.owner_overwrites(member)
+                    )
+                except discord.HTTPException as e:
+                    log.warning("Failed to create temp channel for %s: %s", member.id, e)
+                    return
+                self.registry.add(channel.id, member.guild.id, member.id)
+
+        try:
+            await member.move_to(channel)
+        except discord.HTTPException as e:
+            # Member left voice before the move landed; their channel expires once empty.
+            log.info("Failed to move %s to channel %s: %s", member.id, channel.id, e)
+            if len(channel.members) == 0:
+                self.schedule_expiry(channel.id)
+
+    # ───── EVENTS ────────────────────────────────────────
 
     @commands.Cog.listener()
     async def on_voice_state_update(self, member, before, after):
@@ -27,53 +375,28 @@ class VoiceManager(commands.Cog):
 
         # ─── TEMP VC CREATION ─────────────────────────────
         if after.channel and after.channel.id == entry_channel_id:
-            category = after.channel.category
-            channel_name = f"{member.display_name}'s Channel"
-
-            existing_channel = discord.utils.get(category.voice_channels, name=channel_name)
-            if existing_channel:
-                await member.move_to(existing_channel)
-                return
-
-            new_channel = await category.create_voice_channel(
-                name=channel_name,
-                overwrites={
-                    member.guild.default_role: discord.PermissionOverwrite(connect=True, view_channel=True),
-                    member: discord.PermissionOverwrite(manage_channels=True, connect=True, view_channel=True)
-                }
-            )
-            await member.move_to(new_channel)
+            key = (member.guild.id, member.id)
+            if key in self.join_flights:
+                self.join_retriggered.add(key)
+            else:
+                self.join_flights[key] = asyncio.create_task(self.run_join_flight(member))
 
         # ─── TEMP VC EMPTY TRACKING ───────────────────────
-        if before.channel and before.channel.name.endswith("'s Channel"):
+        if before.channel and self.registry.is_owned(before.channel.id):
             if len(before.channel.members) == 0:
-                self.temp_channels[before.channel.id] = time.time()
+                self.schedule_expiry(before.channel.id)
             else:
-                self.temp_channels.pop(before.channel.id, None)
-
-        if after.channel and after.channel.name.endswith("'s Channel"):
-            self.temp_channels.pop(after.channel.id, None)
-
-    @tasks.loop(seconds=5)
-    async def cleanup_task(self):
-        now = time.time()
-        to_delete = []
-        for channel_id, emptied_at in self.temp_channels.items():
-            if now - emptied_at >= CHANNEL_TIMEOUT_SECONDS:
-                channel = self.bot.get_channel(channel_id)
-                if channel and isinstance(channel, discord.VoiceChannel) and len(channel.members) == 0:
-                    try:
-                        await channel.delete(reason="Temporary VC expired")
-                        to_delete.append(channel_id)
-                    except Exception as e:
-                        print(f"[VoiceManager] Failed to delete channel {channel_id}: {e}")
-                        to_delete.append(channel_id)
-        for cid in to_delete:
-            self.temp_channels.pop(cid, None)
-
-    @cleanup_task.before_loop
-    async def before_cleanup(self):
-        await self.bot.wait_until_ready()
+                self.cancel_expiry(before.channel.id)
+
+        if after.channel and self.registry.is_owned(after.channel.id):
+            self.cancel_expiry(after.channel.id)
+
+    @commands.Cog.listener()
+    async def on_guild_channel_delete(self, channel):
+        if self.registry.is_temp(channel.id):
+            self.cancel_expiry(channel.id)
+            self.registry.remove(channel.id)
+            self.renamed_at.pop(channel.id, None)
 
     # ───── SLASH COMMANDS ────────────────────────────────
 
@@ -3,15 +3,61 @@
 import discord
 from discord.ext import commands
 from discord import app_commands
+import asyncio
+import logging
 
 from database.config_store import get_config, set_config
 
+# Joins are collected for BATCH_WINDOW_SECONDS; while more keep arriving the wait doubles,
+# up to MAX_BATCH_WINDOW_SECONDS, so a join storm becomes a handful of messages.
+BATCH_WINDOW_SECONDS = 2
+MAX_BATCH_WINDOW_SECONDS = 30
+MENTIONS_PER_MESSAGE = 50  # keeps each message well under the 2000 character limit
+
+log = logging.getLogger(__name__)
+
+
 class Welcome(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
+        self.pending = {}  # {guild_id: [member, ...]}
+        self.flush_tasks = {}  # {guild_id: asyncio.Task}
+
+    async def cog_unload(self):
+        for task in self.flush_tasks.values():
+            task.cancel()
+        self.flush_tasks.clear()
+        for guild_id in list(self.pending):
+            await self.flush(guild_id)
 
     @commands.Cog.listener()
     async def on_member_join(self, member: discord.Member):
+        guild_id = member.guild.id
+        self.pending.setdefault(guild_id, []).append(member)
+        if guild_id not in self.flush_tasks:
+            self.flush_tasks[guild_id] = asyncio.create_task(self.wait_and_flush(guild_id))
+
+    async def wait_and_flush(self, guild_id: int):
+        window = BATCH_WINDOW_SECONDS
+        waited = 0
+        seen = 0
+        try:
+            # Keep waiting while the batch is still growing, doubling the window each time.
+            while waited < MAX_BATCH_WINDOW_SECONDS and len(self.pending.get(guild_id, [])) > seen:
+                seen = len(self.pending.get(guild_id, []))
+                delay = min(window, MAX_BATCH_WINDOW_SECONDS - waited)
+                await asyncio.sleep(delay)
+                waited += delay
+                window *= 2
+        finally:
+            self.flush_tasks.pop(guild_id, None)
+        await self.flush(guild_id)
+
+    async def flush(self, guild_id: int):
+        members = self.pending.pop(guild_id, [])
+        if not members:
+            return
+
         if not get_config("welcome_enabled"):
             return
 
@@ -19,11 +65,20 @@ class Welcome(commands.Cog):
         if not channel_id:
             return
 
-        channel = member.guild.get_channel(int(channel_id))
+        channel = members[0].guild.get_channel(int(channel_id))
         if not channel or not isinstance(channel, discord.TextChannel):
             return
 
-        await channel.send(f"👋 Welcome to the server, {member.mention}!")
+        try:
+            if len(members) == 1:
+                await channel.send(f"👋 Welcome to the server, {members[0].mention}!")
+                return
+
+            for i in range(0, len(members), MENTIONS_PER_MESSAGE):
+                chunk = members[i:i + MENTIONS_PER_MESSAGE]
+                await channel.send(f"👋 Welcome to the server, {', '.join(m.mention for m in chunk)}!")
+        except discord.HTTPException as e:
+            log.warning("Failed to send welcome message for %d member(s): %s", len(members), e)
 
     @app_commands.command(name="toggle_welcome", description="(ADMIN ONLY) Enable or disable welcome messages.")
     @app_commands.checks.has_permissions(administrator=True)
@@ -0,0 +1,112 @@
+# database/backup.py
+#
+# Online snapshots of settings.db using SQLite's backup API. The copy runs a few pages at a
+# time and sleeps between steps, so writers only ever wait for one step, never the whole copy.
+# These functions block; call them through asyncio.to_thread.
+
+import os
+import sqlite3
+import time
+from datetime import datetime, timezone
+
+from database.db import connect
+
+DB_PATH = "settings.db"
+BACKUP_DIR = os.getenv("BACKUP_DIR", "backups")
+BACKUP_PREFIX = "settings-"
+PAGES_PER_STEP = 64
+STEP_SLEEP_SECONDS = 0.01
+# SQLite restarts a stepped backup whenever another connection writes to the source.
+MAX_RESTARTS = 3
+
+
+class BackupRestarted(Exception):
+    pass
+
+
+def copy_in_steps(source: sqlite3.Connection, dest: sqlite3.Connection):
+    restarts = 0
+    last_remaining = None
+
+    def progress(status, remaining, total):
+        nonlocal restarts, last_remaining
+        if last_remaining is not None and remaining > last_remaining:
+            restarts += 1
+            if restarts > MAX_RESTARTS:
+                raise BackupRestarted()
+        last_remaining = remaining
+
+    try:
+        source.backup(dest, pages=PAGES_PER_STEP, progress=progress, sleep=STEP_SLEEP_SECONDS)
+    except BackupRestarted:
+        # Under constant writes a stepped copy may never finish. In WAL mode a single-step copy
+        # only holds a read snapshot, which doesn't block writers, so finish that way instead.
+        source.backup(dest)
+
+def backup_database(path: str = DB_PATH, directory: str = BACKUP_DIR) -> str:
+    """Snapshot the database into a new timestamped file and return its name."""
+    os.makedirs(directory, exist_ok=True)
+    # Microseconds keep back-to-back snapshots (e.g. /backup_now, then a restore's safety copy)
+    # from sharing a name, and the counter covers the rare exact collision.
+    stamp = datetime.now(timezone.utc).strftime('%Y%m%d-%H%M%S-%f')
+    name = f"{BACKUP_PREFIX}{stamp}.db"
+    counter = 0
+    while os.path.exists(os.path.join(directory, name)):
+        counter += 1
+        name = f"{BACKUP_PREFIX}{stamp}-{counter}.db"
+    target = os.path.join(directory, name)
+    partial = target + ".partial"
+
+    source = connect(path)
+    dest = sqlite3.connect(partial)
+    try:
+        copy_in_steps(source, dest)
+    finally:
+        dest.close()
+        source.close()
+
+    # Only complete snapshots get a .db name, so a crash mid-copy never leaves a torn backup behind.
+    os.replace(partial, target)
+    return name
+
+def list_backups(directory: str = BACKUP_DIR) -> list[tuple[str, int, float]]:
+    """Return (name, size in bytes, modified time) for each snapshot, newest first."""
+    if not os.path.isdir(directory):
+        return []
+    backups = []
+    for name in os.listdir(directory):
+        if name.startswith(BACKUP_PREFIX) and name.endswith(".db"):
+            stat = os.stat(os.path.join(directory, name))
+            backups.append((name, stat.st_size, stat.st_mtime))
+    return sorted(backups, key=lambda backup: backup[0], reverse=True)
+
+def prune_backups(keep: int, directory: str = BACKUP_DIR) -> list[str]:
+    removed = []
+    for name, _, _ in list_backups(directory)[max(keep, 1):]:
+        os.remove(os.path.join(directory, name))
+        removed.append(name)
+    return removed
+
+def seconds_since_last_backup(directory: str = BACKUP_DIR):
+    backups = list_backups(directory)
+    return time.time() - backups[0][2] if backups else None
+
+def backup_exists(name: str, directory: str = BACKUP_DIR) -> bool:
+    return name in {backup[0] for backup in list_backups(directory)}
+
+def restore_backup(name: str, path: str = DB_PATH, directory: str = BACKUP_DIR):
+    """Copy a snapshot back over the live database through the backup API.
+
+    Going through SQLite (rather than replacing the file) keeps open connections and other
+    cluster workers consistent: they see the restored data on their next read.
+    """
+    if not backup_exists(name, directory):
+        raise FileNotFoundError(f"No backup named {name}")
+
+    source = sqlite3.connect(f"file:{os.path.join(directory, name)}?mode=ro", uri=True)
+    dest = connect(path)
+    try:
+        source.backup(dest)
+    finally:
+        dest.close()
+        source.close()
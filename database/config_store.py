@@ -1,11 +1,22 @@
 # database/config_store.py
 
-import sqlite3
+from database.db import connect, enable_wal
+from utils.metrics import db_call
 
 DB_PATH = "settings.db"
 
+_config_listeners = []  # callables notified with the key after every set_config
+
+def add_config_listener(callback):
+    _config_listeners.append(callback)
+
+def remove_config_listener(callback):
+    if callback in _config_listeners:
+        _config_listeners.remove(callback)
+
 def init_config_db():
-    conn = sqlite3.connect(DB_PATH)
+    enable_wal(DB_PATH)
+    conn = connect(DB_PATH)
     c = conn.cursor()
     c.execute('''
         CREATE TABLE IF NOT EXISTS bot_config (
@@ -16,8 +27,9 @@ def init_config_db():
     conn.commit()
     conn.close()
 
+@db_call("config")
 def set_config(key: str, value):
-    conn = sqlite3.connect(DB_PATH)
+    conn = connect(DB_PATH)
     c = conn.cursor()
     c.execute('''
         INSERT INTO bot_config (key, value)
@@ -26,17 +38,21 @@ def set_config(key: str, value):
     ''', (key, repr(value)))
     conn.commit()
     conn.close()
+    for callback in list(_config_listeners):
+        callback(key)
 
+@db_call("config")
 def get_config(key: str):
-    conn = sqlite3.connect(DB_PATH)
+    conn = connect(DB_PATH)
     c = conn.cursor()
     c.execute('SELECT value FROM bot_config WHERE key = ?', (key,))
     result = c.fetchone()
     conn.close()
     return eval(result[0]) if result else None
 
+@db_call("config")
 def get_all_config() -> dict:
-    conn = sqlite3.connect(DB_PATH)
+    conn = connect(DB_PATH)
     c = conn.cursor()
     c.execute('SELECT key, value FROM bot_config')
     rows = c.fetchall()
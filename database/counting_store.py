@@ -0,0 +1,151 @@
+# database/counting_store.py
+#
+# counting_events is an append-only log of every count and break. When a run breaks, its events
+# are summarised into counting_runs / counting_run_users in the same transaction, and
+# compact_events() later deletes the per-message rows of old runs, so history and records only
+# ever read the summary tables.
+
+from database.db import connect, enable_wal
+from utils.metrics import db_call
+
+DB_PATH = "settings.db"
+
+def init_counting_db():
+    enable_wal(DB_PATH)
+    conn = connect(DB_PATH)
+    c = conn.cursor()
+    c.execute('''
+        CREATE TABLE IF NOT EXISTS counting_events (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            run_id INTEGER,
+            user_id INTEGER,
+            number INTEGER,
+            kind TEXT,
+            created_at REAL
+        )
+    ''')
+    c.execute('''
+        CREATE INDEX IF NOT EXISTS idx_counting_events_run
+        ON counting_events (run_id)
+    ''')
+    c.execute('''
+        CREATE TABLE IF NOT EXISTS counting_runs (
+            run_id INTEGER PRIMARY KEY,
+            started_at REAL,
+            ended_at REAL,
+            length INTEGER,
+            counts INTEGER,
+            participants INTEGER,
+            broken_by INTEGER,
+            broken_at INTEGER
+        )
+    ''')
+    c.execute('''
+        CREATE INDEX IF NOT EXISTS idx_counting_runs_length
+        ON counting_runs (length DESC)
+    ''')
+    c.execute('''
+        CREATE INDEX IF NOT EXISTS idx_counting_runs_broken_by
+        ON counting_runs (broken_by)
+    ''')
+    c.execute('''
+        CREATE TABLE IF NOT EXISTS counting_run_users (
+            run_id INTEGER,
+            user_id INTEGER,
+            counts INTEGER,
+            PRIMARY KEY (run_id, user_id)
+        )
+    ''')
+    c.execute('''
+        CREATE INDEX IF NOT EXISTS idx_counting_run_users_user
+        ON counting_run_users (user_id)
+    ''')
+    conn.commit()
+    conn.close()
+
+def summarize_run(c, run_id: int, ended_at: float, broken_by: int, broken_at: int):
+    c.execute('''
+        INSERT OR REPLACE INTO counting_runs
+            (run_id, started_at, ended_at, length, counts, participants, broken_by, broken_at)
+        SELECT ?, COALESCE(MIN(created_at), ?), ?, COALESCE(MAX(number), 0), COUNT(*), COUNT(DISTINCT user_id), ?, ?
+        FROM counting_events WHERE run_id = ? AND kind = 'count'
+    ''', (run_id, ended_at, ended_at, broken_by, broken_at, run_id))
+    c.execute('''
+        INSERT OR REPLACE INTO counting_run_users (run_id, user_id, counts)
+        SELECT run_id, user_id, COUNT(*) FROM counting_events
+        WHERE run_id = ? AND kind = 'count'
+        GROUP BY user_id
+    ''', (run_id,))
+
+@db_call("counting")
+def append_events(events: list[tuple]):
+    """Write a batch of (run_id, user_id, number, kind, created_at) events in one transaction."""
+    conn = connect(DB_PATH)
+    c = conn.cursor()
+    c.executemany('''
+        INSERT INTO counting_events (run_id, user_id, number, kind, created_at)
+        VALUES (?, ?, ?, ?, ?)
+    ''', events)
+    for run_id, user_id, number, kind, created_at in events:
+        if kind == "break":
+            summarize_run(c, run_id, created_at, user_id, number)
+    conn.commit()
+    conn.close()
+
+@db_call("counting")
+def compact_events(ended_before: float) -> int:
+    """Drop per-message events of runs that ended before the cutoff; their summaries stay."""
+    conn = connect(DB_PATH)
+    c = conn.cursor()
+    c.execute('''
+        DELETE FROM counting_events
+        WHERE run_id IN (SELECT run_id FROM counting_runs WHERE ended_at < ?)
+    ''', (ended_before,))
+    deleted = c.rowcount
+    conn.commit()
+    conn.close()
+    return deleted
+
+@db_call("counting")
+def get_recent_runs(limit: int = 10):
+    conn = connect(DB_PATH)
+    c = conn.cursor()
+    c.execute('''
+        SELECT run_id, started_at, ended_at, length, counts, participants, broken_by, broken_at
+        FROM counting_runs
+        ORDER BY run_id DESC
+        LIMIT ?
+    ''', (limit,))
+    results = c.fetchall()
+    conn.close()
+    return results
+
+@db_call("counting")
+def get_longest_runs(limit: int = 3):
+    conn = connect(DB_PATH)
+    c = conn.cursor()
+    c.execute('''
+        SELECT run_id, started_at, ended_at, length, counts, participants, broken_by, broken_at
+        FROM counting_runs
+        ORDER BY length DESC
+        LIMIT ?
+    ''', (limit,))
+    results = c.fetchall()
+    conn.close()
+    return results
+
+@db_call("counting")
+def get_user_record(user_id: int):
+    """Return (runs joined, total counts, best run length, runs broken) for a user."""
+    conn = connect(DB_PATH)
+    c = conn.cursor()
+    c.execute('''
+        SELECT COUNT(*), COALESCE(SUM(u.counts), 0), COALESCE(MAX(r.length), 0)
+        FROM counting_run_users u JOIN counting_runs r ON r.run_id = u.run_id
+        WHERE u.user_id = ?
+    ''', (user_id,))
+    runs, counts, best = c.fetchone()
+    c.execute('SELECT COUNT(*) FROM counting_runs WHERE broken_by = ?', (user_id,))
+    breaks = c.fetchone()[0]
+    conn.close()
+    return runs, counts, best, breaks
@@ -0,0 +1,29 @@
+# database/db.py
+
+import sqlite3
+
+# Several worker processes can share one database file in cluster mode (see cluster.py).
+# WAL lets readers run alongside a writer, and the busy timeout makes a writer wait for
+# the lock instead of failing with "database is locked".
+BUSY_TIMEOUT_SECONDS = 30
+
+def connect(path: str) -> sqlite3.Connection:
+    return sqlite3.connect(path, timeout=BUSY_TIMEOUT_SECONDS)
+
+def enable_wal(path: str):
+    conn = connect(path)
+    conn.execute('PRAGMA journal_mode=WAL')
+    conn.close()
+
+def add_missing_columns(conn: sqlite3.Connection, table: str, columns: dict[str, str]):
+    """Upgrade a table created by an older version: ALTER TABLE ADD COLUMN for each {name: type} it lacks."""
+    existing = {row[1] for row in conn.execute(f"PRAGMA table_info({table})")}
+    for name, decl in columns.items():
+        if name in existing:
+            continue
+        try:
+            conn.execute(f"ALTER TABLE {table} ADD COLUMN {name} {decl}")
+        except sqlite3.OperationalError as e:
+            # Another cluster worker may have added it between the check and the ALTER.
+            if "duplicate column" not in str(e):
+                raise
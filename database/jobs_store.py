@@ -0,0 +1,72 @@
+# database/jobs_store.py
+
+from database.db import connect, enable_wal
+from utils.metrics import db_call
+
+DB_PATH = "settings.db"
+
+def init_jobs_db():
+    enable_wal(DB_PATH)
+    conn = connect(DB_PATH)
+    c = conn.cursor()
+    c.execute('''
+        CREATE TABLE IF NOT EXISTS scheduled_jobs (
+            name TEXT,
+            cluster_id INTEGER,
+            next_run REAL,
+            last_started REAL,
+            last_duration REAL,
+            last_status TEXT,
+            last_error TEXT,
+            runs INTEGER DEFAULT 0,
+            failures INTEGER DEFAULT 0,
+            PRIMARY KEY (name, cluster_id)
+        )
+    ''')
+    conn.commit()
+    conn.close()
+
+@db_call("jobs")
+def get_job(name: str, cluster_id: int):
+    """Return (next_run, last_started, last_duration, last_status, last_error, runs, failures) or None."""
+    conn = connect(DB_PATH)
+    c = conn.cursor()
+    c.execute('''
+        SELECT next_run, last_started, last_duration, last_status, last_error, runs, failures
+        FROM scheduled_jobs WHERE name = ? AND cluster_id = ?
+    ''', (name, cluster_id))
+    row = c.fetchone()
+    conn.close()
+    return row
+
+@db_call("jobs")
+def save_job_schedule(name: str, cluster_id: int, next_run: float):
+    conn = connect(DB_PATH)
+    c = conn.cursor()
+    c.execute('''
+        INSERT INTO scheduled_jobs (name, cluster_id, next_run)
+        VALUES (?, ?, ?)
+        ON CONFLICT(name, cluster_id) DO UPDATE SET next_run = excluded.next_run
+    ''', (name, cluster_id, next_run))
+    conn.commit()
+    conn.close()
+
+@db_call("jobs")
+def record_job_run(name: str, cluster_id: int, started: float, duration: float, error, next_run: float):
+    conn = connect(DB_PATH)
+    c = conn.cursor()
+    c.execute('''
+        INSERT INTO scheduled_jobs
+            (name, cluster_id, next_run, last_started, last_duration, last_status, last_error, runs, failures)
+        VALUES (?, ?, ?, ?, ?, ?, ?, 1, ?)
+        ON CONFLICT(name, cluster_id) DO UPDATE SET
+            next_run = excluded.next_run,
+            last_started = excluded.last_started,
+            last_duration = excluded.last_duration,
+            last_status = excluded.last_status,
+            last_error = excluded.last_error,
+            runs = scheduled_jobs.runs + 1,
+            failures = scheduled_jobs.failures + excluded.failures
+    ''', (name, cluster_id, next_run, started, duration, "error" if error else "ok", error, 1 if error else 0))
+    conn.commit()
+    conn.close()
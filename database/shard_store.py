@@ -0,0 +1,59 @@
+# database/shard_store.py
+
+import time
+
+from database.db import connect, enable_wal
+from utils.metrics import db_call
+
+DB_PATH = "settings.db"
+
+def init_shard_db():
+    enable_wal(DB_PATH)
+    conn = connect(DB_PATH)
+    c = conn.cursor()
+    c.execute('''
+        CREATE TABLE IF NOT EXISTS shard_health (
+            shard_id INTEGER PRIMARY KEY,
+            cluster_id INTEGER,
+            pid INTEGER,
+            latency REAL,
+            guilds INTEGER,
+            updated_at REAL
+        )
+    ''')
+    conn.commit()
+    conn.close()
+
+@db_call("shard")
+def report_shard_health(shard_id: int, cluster_id: int, pid: int, latency, guilds: int):
+    conn = connect(DB_PATH)
+    c = conn.cursor()
+    c.execute('''
+        INSERT INTO shard_health (shard_id, cluster_id, pid, latency, guilds, updated_at)
+        VALUES (?, ?, ?, ?, ?, ?)
+        ON CONFLICT(shard_id) DO UPDATE SET
+            cluster_id = excluded.cluster_id,
+            pid = excluded.pid,
+            latency = excluded.latency,
+            guilds = excluded.guilds,
+            updated_at = excluded.updated_at
+    ''', (shard_id, cluster_id, pid, latency, guilds, time.time()))
+    conn.commit()
+    conn.close()
+
+@db_call("shard")
+def get_shard_health():
+    conn = connect(DB_PATH)
+    c = conn.cursor()
+    c.execute('SELECT shard_id, cluster_id, pid, latency, guilds, updated_at FROM shard_health ORDER BY shard_id')
+    rows = c.fetchall()
+    conn.close()
+    return rows
+
+@db_call("shard")
+def clear_shard_health():
+    conn = connect(DB_PATH)
+    c = conn.cursor()
+    c.execute('DELETE FROM shard_health')
+    conn.commit()
+    conn.close()
@@ -1,11 +1,22 @@
 # database/stats_store.py
 
-import sqlite3
+from datetime import datetime, timedelta, timezone
+
+from database.db import connect, enable_wal
+from utils.metrics import db_call
 
 DB_PATH = "settings.db"
 
+# Per-period rollups of increment_user_stat, keyed by a sortable bucket string (UTC).
+BUCKET_FORMATS = {"day": "%Y-%m-%d", "week": "%G-W%V", "month": "%Y-%m"}
+BUCKET_RETENTION = {"day": timedelta(days=35), "week": timedelta(weeks=27), "month": timedelta(days=730)}
+
+def bucket_key(period: str, when: datetime = None) -> str:
+    return (when or datetime.now(timezone.utc)).strftime(BUCKET_FORMATS[period])
+
 def init_stats_db():
-    conn = sqlite3.connect(DB_PATH)
+    enable_wal(DB_PATH)
+    conn = connect(DB_PATH)
     c = conn.cursor()
     c.execute('''
         CREATE TABLE IF NOT EXISTS user_stats (
@@ -15,6 +26,20 @@ def init_stats_db():
             PRIMARY KEY (user_id, stat)
         )
     ''')
+    c.execute('''
+        CREATE TABLE IF NOT EXISTS user_stat_buckets (
+            stat TEXT,
+            period TEXT,
+            bucket TEXT,
+            user_id INTEGER,
+            value INTEGER,
+            PRIMARY KEY (stat, period, bucket, user_id)
+        )
+    ''')
+    c.execute('''
+        CREATE INDEX IF NOT EXISTS idx_user_stat_buckets_top
+        ON user_stat_buckets (stat, period, bucket, value DESC)
+    ''')
     c.execute('''
         CREATE TABLE IF NOT EXISTS global_stats (
             key TEXT PRIMARY KEY,
@@ -24,8 +49,9 @@ def init_stats_db():
     conn.commit()
     conn.close()
 
+@db_call("stats")
 def set_user_stat(user_id: int, stat: str, value: int):
-    conn = sqlite3.connect(DB_PATH)
+    conn = connect(DB_PATH)
     c = conn.cursor()
     c.execute('''
         INSERT INTO user_stats (user_id, stat, value)
@@ -35,20 +61,38 @@ def set_user_stat(user_id: int, stat: str, value: int):
     conn.commit()
     conn.close()
 
+@db_call("stats")
 def get_user_stat(user_id: int, stat: str) -> int:
-    conn = sqlite3.connect(DB_PATH)
+    conn = connect(DB_PATH)
     c = conn.cursor()
     c.execute('SELECT value FROM user_stats WHERE user_id = ? AND stat = ?', (user_id, stat))
     row = c.fetchone()
     conn.close()
     return row[0] if row else 0
 
+@db_call("stats")
 def increment_user_stat(user_id: int, stat: str, amount: int = 1):
-    current = get_user_stat(user_id, stat)
-    set_user_stat(user_id, stat, current + amount)
+    # UPSERTs so concurrent writers (other coroutines or cluster workers) can't lose increments;
+    # the total and its period buckets commit together.
+    now = datetime.now(timezone.utc)
+    conn = connect(DB_PATH)
+    c = conn.cursor()
+    c.execute('''
+        INSERT INTO user_stats (user_id, stat, value)
+        VALUES (?, ?, ?)
+        ON CONFLICT(user_id, stat) DO UPDATE SET value = user_stats.value + excluded.value
+    ''', (user_id, stat, amount))
+    c.executemany('''
+        INSERT INTO user_stat_buckets (stat, period, bucket, user_id, value)
+        VALUES (?, ?, ?, ?, ?)
+        ON CONFLICT(stat, period, bucket, user_id) DO UPDATE SET value = user_stat_buckets.value + excluded.value
+    ''', [(stat, period, bucket_key(period, now), user_id, amount) for period in BUCKET_FORMATS])
+    conn.commit()
+    conn.close()
 
+@db_call("stats")
 def get_top_users(stat: str, limit: int = 10):
-    conn = sqlite3.connect(DB_PATH)
+    conn = connect(DB_PATH)
     c = conn.cursor()
     c.execute('''
         SELECT user_id, value FROM user_stats
@@ -60,8 +104,40 @@ def get_top_users(stat: str, limit: int = 10):
     conn.close()
     return results
 
+@db_call("stats")
+def get_top_users_windowed(stat: str, period: str, limit: int = 10, bucket: str = None):
+    """Top users for one day/week/month bucket; defaults to the current one."""
+    conn = connect(DB_PATH)
+    c = conn.cursor()
+    c.execute('''
+        SELECT user_id, value FROM user_stat_buckets
+        WHERE stat = ? AND period = ? AND bucket = ?
+        ORDER BY value DESC
+        LIMIT ?
+    ''', (stat, period, bucket or bucket_key(period), limit))
+    results = c.fetchall()
+    conn.close()
+    return results
+
+@db_call("stats")
+def prune_stat_buckets() -> int:
+    now = datetime.now(timezone.utc)
+    conn = connect(DB_PATH)
+    c = conn.cursor()
+    deleted = 0
+    for period, retention in BUCKET_RETENTION.items():
+        c.execute(
+            'DELETE FROM user_stat_buckets WHERE period = ? AND bucket < ?',
+            (period, bucket_key(period, now - retention))
+        )
+        deleted += c.rowcount
+    conn.commit()
+    conn.close()
+    return deleted
+
+@db_call("stats")
 def set_global_stat(key: str, value: int):
-    conn = sqlite3.connect(DB_PATH)
+    conn = connect(DB_PATH)
     c = conn.cursor()
     c.execute('''
         INSERT INTO global_stats (key, value)
@@ -71,8 +147,9 @@ def set_global_stat(key: str, value: int):
     conn.commit()
     conn.close()
 
+@db_call("stats")
 def get_global_stat(key: str) -> int:
-    conn = sqlite3.connect(DB_PATH)
+    conn = connect(DB_PATH)
     c = conn.cursor()
     c.execute('SELECT value FROM global_stats WHERE key = ?', (key,))
     row = c.fetchone()
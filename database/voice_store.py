@@ -0,0 +1,62 @@
+# database/voice_store.py
+
+from database.db import connect, enable_wal
+from utils.metrics import db_call
+
+DB_PATH = "settings.db"
+
+def init_voice_db():
+    enable_wal(DB_PATH)
+    conn = connect(DB_PATH)
+    c = conn.cursor()
+    c.execute('''
+        CREATE TABLE IF NOT EXISTS temp_voice_channels (
+            channel_id INTEGER PRIMARY KEY,
+            guild_id INTEGER,
+            owner_id INTEGER,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+    c.execute('''
+        CREATE INDEX IF NOT EXISTS idx_temp_voice_owner
+        ON temp_voice_channels (guild_id, owner_id)
+    ''')
+    conn.commit()
+    conn.close()
+
+@db_call("voice")
+def add_temp_channel(channel_id: int, guild_id: int, owner_id):
+    conn = connect(DB_PATH)
+    c = conn.cursor()
+    c.execute('''
+        INSERT INTO temp_voice_channels (channel_id, guild_id, owner_id)
+        VALUES (?, ?, ?)
+        ON CONFLICT(channel_id) DO UPDATE SET guild_id = excluded.guild_id, owner_id = excluded.owner_id
+    ''', (channel_id, guild_id, owner_id))
+    conn.commit()
+    conn.close()
+
+@db_call("voice")
+def set_temp_channel_owner(channel_id: int, owner_id):
+    conn = connect(DB_PATH)
+    c = conn.cursor()
+    c.execute('UPDATE temp_voice_channels SET owner_id = ? WHERE channel_id = ?', (owner_id, channel_id))
+    conn.commit()
+    conn.close()
+
+@db_call("voice")
+def remove_temp_channel(channel_id: int):
+    conn = connect(DB_PATH)
+    c = conn.cursor()
+    c.execute('DELETE FROM temp_voice_channels WHERE channel_id = ?', (channel_id,))
+    conn.commit()
+    conn.close()
+
+@db_call("voice")
+def get_temp_channels():
+    conn = connect(DB_PATH)
+    c = conn.cursor()
+    c.execute('SELECT channel_id, guild_id, owner_id FROM temp_voice_channels')
+    rows = c.fetchall()
+    conn.close()
+    return rows
@@ -1,60 +1,155 @@
 # main.py
 
 import os
+import time
+import asyncio
 import logging
+from pathlib import Path
 import discord
-from discord.ext import commands
 from dotenv import load_dotenv
+from utils.logging_setup import setup_logging
 from database.stats_store import init_stats_db
-init_stats_db()
-
+from database.config_store import init_config_db
+from utils.command_sync import sync_commands
+from utils.features import build_intents, build_member_cache_flags, requirements_report
+from utils.message_router import MessageRouter
+from utils.scheduler import Scheduler
+from utils.instrumentation import InstrumentedBot, InstrumentedAutoShardedBot
+from utils.sharding import report_health_forever
+from database.shard_store import init_shard_db
 load_dotenv()
+setup_logging()
+
+init_stats_db()
+init_config_db()
+init_shard_db()
 
 TOKEN = os.getenv("DISCORD_TOKEN")
 GUILD_ID = os.getenv("GUILD_ID")
 SYNC_MODE = os.getenv("SYNC_MODE", "global").lower()
+# "single" runs one gateway connection, "auto" lets discord.py shard inside this process.
+# For shard groups spread over several processes, run cluster.py instead.
+SHARD_MODE = os.getenv("SHARD_MODE", "single").lower()
+
+# Comma-separated cog names, e.g. COGS_ENABLED="welcome,counting_game" or COGS_DISABLED="reddit_mirror"
+COGS_ENABLED = os.getenv("COGS_ENABLED", "")
+COGS_DISABLED = os.getenv("COGS_DISABLED", "")
+
+# Cogs that must finish loading before the listed cog starts: {"cog": ["dependency", ...]}
+COG_DEPENDENCIES = {}
+
+
+def parse_cog_list(value: str) -> set[str]:
+    return {name.strip() for name in value.split(",") if name.strip()}
+
+
+def select_cogs() -> list[str]:
+    names = sorted(file.stem for file in Path("./cogs").glob("*.py") if not file.name.startswith("_"))
+
+    enabled = parse_cog_list(COGS_ENABLED)
+    disabled = parse_cog_list(COGS_DISABLED)
+    if enabled:
+        names = [name for name in names if name in enabled]
+    return [name for name in names if name not in disabled]
 
-intents = discord.Intents.all()
-bot = commands.Bot(command_prefix="!", intents=intents)
 
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
-@bot.event
-async def on_ready():
-    print(f"🤖 Logged in as {bot.user} ({bot.user.id})")
-    print(f"🔧 Sync mode: {SYNC_MODE}")
+async def load_cogs(bot, names: list[str]):
+    """Load cogs concurrently, holding back any cog until its COG_DEPENDENCIES have loaded."""
+    done = {name: asyncio.Event() for name in names}
+    timings = {}
+
+    async def load(name):
+        for dependency in COG_DEPENDENCIES.get(name, []):
+            if dependency in done:
+                await done[dependency].wait()
+
+        start = time.perf_counter()
+        try:
+            await bot.load_extension(f"cogs.{name}")
+            timings[name] = (time.perf_counter() - start, None)
+        except Exception as e:
+            timings[name] = (time.perf_counter() - start, e)
+        finally:
+            done[name].set()
 
-    try:
-        if SYNC_MODE == "dev" and GUILD_ID:
-            guild = discord.Object(id=int(GUILD_ID))
-            synced = await bot.tree.sync(guild=guild)
-            logger.info(f"🧪 Synced {len(synced)} slash command(s) to dev guild {guild.id}.")
-            print(f"🧪 Synced {len(synced)} slash command(s) to dev guild {guild.id}.\n")
+    start = time.perf_counter()
+    await asyncio.gather(*(load(name) for name in names))
+    total = time.perf_counter() - start
+
+    for name, (elapsed, error) in sorted(timings.items(), key=lambda item: item[1][0], reverse=True):
+        if error:
+            logger.error("❌ Failed to load cog %s (%.0fms): %s", name, elapsed * 1000, error)
         else:
-            synced = await bot.tree.sync()
-            logger.info(f"🌍 Synced {len(synced)} slash command(s) globally.")
-            print(f"🌍 Synced {len(synced)} slash command(s) globally.\n")
-    except Exception as e:
-        logger.error(f"❌ Slash command sync failed: {e}")
-        print(f"❌ Slash command sync failed: {e}\n")
-
-
-@bot.event
-async def setup_hook():
-    from pathlib import Path
-
-    cog_folder = Path("./cogs")
-    for file in cog_folder.glob("*.py"):
-        if file.name.startswith("_"):
-            continue
+            logger.info("✅ Loaded cog: %s (%.0fms)", name, elapsed * 1000)
+    loaded = sum(1 for _, error in timings.values() if error is None)
+    logger.info("📦 Loaded %d/%d cog(s) in %.0fms", loaded, len(names), total * 1000)
+
+
+def create_bot(shard_ids: list[int] = None, shard_count: int = None, cluster_id: int = 0):
+    """Build the bot. cluster.py passes a shard group; otherwise SHARD_MODE decides."""
+    active_cogs = select_cogs()
+
+    # Only ask the gateway for what the loaded cogs use, and fetch member lists on demand instead of at startup.
+    intents = build_intents(active_cogs)
+    options = dict(
+        command_prefix="!",
+        intents=intents,
+        member_cache_flags=build_member_cache_flags(active_cogs),
+        chunk_guilds_at_startup=False
+    )
+    if shard_ids is not None:
+        bot = InstrumentedAutoShardedBot(shard_ids=shard_ids, shard_count=shard_count, **options)
+    elif SHARD_MODE == "auto":
+        bot = InstrumentedAutoShardedBot(**options)
+    else:
+        bot = InstrumentedBot(**options)
+
+    bot.cluster_id = cluster_id
+    bot.message_router = MessageRouter(bot)
+    bot.scheduler = Scheduler(bot, cluster_id)
+
+    @bot.event
+    async def on_ready():
+        logger.info("🤖 Logged in as %s (%s)", bot.user, bot.user.id)
+        logger.info("🔧 Sync mode: %s", SYNC_MODE)
+        if bot.shard_count:
+            logger.info("🧩 Cluster %s: shard(s) %s of %s", cluster_id, bot.shard_ids or [bot.shard_id], bot.shard_count)
+
+        # Every worker shares one command tree; only the first cluster talks to the sync endpoint.
+        if cluster_id != 0:
+            return
+
         try:
-            await bot.load_extension(f"cogs.{file.stem}")
-            print(f"✅ Loaded cog: {file.stem}")
+            if SYNC_MODE == "dev" and GUILD_ID:
+                guild = discord.Object(id=int(GUILD_ID))
+                synced = await sync_commands(bot.tree, guild=guild)
+                scope = f"dev guild {guild.id}"
+            else:
+                synced = await sync_commands(bot.tree)
+                scope = "global"
+
+            if synced is None:
+                logger.info("⏭️ Slash commands unchanged (%s), skipping sync.", scope)
+            else:
+                logger.info("🔄 Synced %d slash command(s) (%s).", len(synced), scope)
         except Exception as e:
-            print(f"❌ Failed to load cog {file.stem}: {e}")
+            logger.error("❌ Slash command sync failed: %s", e)
+
+    @bot.event
+    async def setup_hook():
+        enabled = [name for name, value in intents if value]
+        logger.info("🧭 Gateway intents: %s", ", ".join(enabled))
+        for line in requirements_report(active_cogs):
+            logger.info("   • %s", line)
+        await load_cogs(bot, active_cogs)
+        bot.health_task = asyncio.create_task(report_health_forever(bot, cluster_id))
+
+    return bot
 
 
 if __name__ == "__main__":
-    bot.run(TOKEN)
+    # log_handler=None keeps discord.py from installing its own blocking stream handler.
+    create_bot().run(TOKEN, log_handler=None)
@@ -0,0 +1,221 @@
+# tools/fake_reddit.py
+#
+# Offline stand-in for the slice of PRAW that RedditMirror uses:
+# reddit.subreddit(name).new(limit=...) and reddit.auth.limits.
+
+import json
+import random
+import threading
+import time
+
+
+class FakeRedditError(Exception):
+    pass
+
+
+class TooManyRequests(FakeRedditError):
+    # Same class name as prawcore's 429 exception so InstrumentedReddit treats it the same way.
+    pass
+
+
+class FakeSubmission:
+    def __init__(self, data: dict):
+        self.id = data["id"]
+        self.title = data.get("title", "")
+        self.url = data.get("url", "")
+        self.permalink = data.get("permalink", f"/r/test/comments/{self.id}/")
+        self.author = data.get("author", "[deleted]")
+        self.selftext = data.get("selftext", "")
+        self.score = data.get("score", 0)
+        self.is_gallery = data.get("is_gallery", False)
+        self.is_video = data.get("is_video", False)
+        self.created_utc = data.get("created_utc", time.time())
+
+        # PRAW only sets these attributes when Reddit returned them.
+        for key in ("gallery_data", "media_metadata", "preview", "media", "secure_media", "crosspost_parent_list"):
+            if data.get(key) is not None:
+                setattr(self, key, data[key])
+
+
+class FakeAuth:
+    def __init__(self, backend):
+        self._backend = backend
+
+    @property
+    def limits(self) -> dict:
+        return {
+            "remaining": self._backend.remaining,
+            "reset_timestamp": self._backend.reset_at,
+            "used": self._backend.used,
+        }
+
+
+class FakeSubreddit:
+    def __init__(self, backend, name: str):
+        self._backend = backend
+        self.display_name = name
+
+    def new(self, limit: int = 100):
+        return iter(self._backend.request(limit))
+
+
+class FakeReddit:
+    """Serves a listing from memory with configurable latency, jitter, error rate and rate limit budget.
+
+    Posts are queued and only become visible once `arrive()` releases them, so a replay can feed
+    the mirror a few new posts per tick the way a live subreddit would.
+    """
+
+    def __init__(self, posts: list[dict], latency: float = 0.0, jitter: float = 0.0,
+                 error_rate: float = 0.0, budget: int = 1000, window_seconds: float = 600, seed=None):
+        self.pending = [FakeSubmission(p) for p in posts]
+        self.visible = []  # newest first, like /new
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.budget = budget
+        self.window_seconds = window_seconds
+        self.rng = random.Random(seed)
+        self.requests = 0
+        self.failures = 0
+        self.remaining = None
+        self.used = None
+        self.reset_at = None
+        self.auth = FakeAuth(self)
+        self._lock = threading.Lock()
+
+    def subreddit(self, name: str) -> FakeSubreddit:
+        return FakeSubreddit(self, name)
+
+    def arrive(self, count: int) -> int:
+        released = self.pending[:count]
+        del self.pending[:count]
+        self.visible[0:0] = reversed(released)
+        return len(released)
+
+    def request(self, limit: int) -> list[FakeSubmission]:
+        delay = self.latency + self.rng.uniform(0, self.jitter) if self.jitter else self.latency
+        if delay:
+            time.sleep(delay)
+
+        with self._lock:
+            now = time.time()
+            if self.reset_at is None or now >= self.reset_at:
+                self.reset_at = now + self.window_seconds
+                self.used = 0
+                self.remaining = float(self.budget)
+
+            self.requests += 1
+            if self.remaining <= 0:
+                self.failures += 1
+                raise TooManyRequests("received 429 HTTP response")
+
+            self.used += 1
+            self.remaining -= 1
+
+            if self.error_rate and self.rng.random() < self.error_rate:
+                self.failures += 1
+                raise FakeRedditError("received 503 HTTP response")
+
+            return list(self.visible[:limit])
+
+
+PREVIEW_WIDTHS = (108, 216, 320, 640, 960, 1080)
+
+
+def preview_renditions(base_url: str, width: int, height: int) -> list[tuple[str, int, int]]:
+    """The downscaled copies Reddit generates next to every uploaded image, smallest first."""
+    return [
+        (f"{base_url}?width={w}&amp;crop=smart&amp;auto=webp", w, height * w // width)
+        for w in PREVIEW_WIDTHS if w < width
+    ]
+
+
+def synthetic_preview(image_id: str, width: int = 3000, height: int = 2000) -> dict:
+    base = f"https://preview.redd.it/{image_id}.jpg"
+    return {"images": [{
+        "id": image_id,
+        "source": {"url": f"{base}?auto=webp&amp;s={image_id}", "width": width, "height": height},
+        "resolutions": [{"url": u, "width": w, "height": h} for u, w, h in preview_renditions(base, width, height)],
+    }]}
+
+
+def synthetic_posts(count: int, gallery_ratio: float = 0.3, images_per_gallery: int = 5,
+                    min_score: int = 0, max_score: int = 200, seed=None) -> list[dict]:
+    rng = random.Random(seed)
+    posts = []
+    for i in range(count):
+        post_id = f"fake{i:06d}"
+        post = {
+            "id": post_id,
+            "title": f"Synthetic post #{i}",
+            "permalink": f"/r/fake/comments/{post_id}/synthetic_post_{i}/",
+            "author": f"user{rng.randrange(1000)}",
+            "selftext": "" if rng.random() < 0.5 else "Lorem ipsum " * rng.randrange(1, 60),
+            "score": rng.randint(min_score, max_score),
+            "created_utc": time.time() + i,
+        }
+
+        if rng.random() < gallery_ratio:
+            items = []
+            metadata = {}
+            for n in range(images_per_gallery):
+                media_id = f"{post_id}m{n}"
+                items.append({"media_id": media_id, "id": n})
+                base = f"https://preview.redd.it/{media_id}.jpg"
+                metadata[media_id] = {
+                    "status": "valid",
+                    "e": "Image",
+                    "m": "image/jpg",
+                    "p": [{"u": u, "x": w, "y": h} for u, w, h in preview_renditions(base, 3000, 2000)],
+                    "s": {"u": f"{base}?width=3000&amp;format=pjpg", "x": 3000, "y": 2000},
+                }
+            post.update({
+                "url": f"https://www.reddit.com/gallery/{post_id}",
+                "is_gallery": True,
+                "gallery_data": {"items": items},
+                "media_metadata": metadata,
+            })
+        elif rng.random() < 0.5:
+            post["url"] = f"https://i.redd.it/{post_id}.jpg"
+            post["preview"] = synthetic_preview(post_id)
+        elif rng.random() < 0.3:
+            post.update({
+                "url": f"https://v.redd.it/{post_id}",
+                "is_video": True,
+                "preview": synthetic_preview(post_id, 1920, 1080),
+                "secure_media": {"reddit_video": {"fallback_url": f"https://v.redd.it/{post_id}/DASH_720.mp4"}},
+            })
+        else:
+            post["url"] = f"https://example.com/articles/{post_id}"
+
+        # Crossposts of an earlier post: the media lives on the parent, not the crosspost itself.
+        if posts and rng.random() < 0.05:
+            parent = rng.choice(posts)
+            post.update({
+                "url": parent.get("url", ""),
+                "crosspost_parent_list": [{k: v for k, v in parent.items() if k != "crosspost_parent_list"}],
+            })
+            for key in ("is_gallery", "is_video", "preview", "gallery_data", "media_metadata", "secure_media"):
+                post.pop(key, None)
+
+        posts.append(post)
+    return posts
+
+
+def load_posts(path: str) -> list[dict]:
+    """Load a recorded listing: either Reddit's raw /new.json Listing or a plain list of post dicts.
+
+    Posts come back oldest first so `FakeReddit.arrive()` releases them in posting order.
+    """
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+
+    if isinstance(data, dict) and data.get("kind") == "Listing":
+        posts = [child["data"] for child in data["data"]["children"]]
+    elif isinstance(data, list):
+        posts = [item.get("data", item) for item in data]
+    else:
+        raise ValueError(f"Unrecognised listing format in {path}")
+
+    return sorted(posts, key=lambda p: p.get("created_utc", 0))
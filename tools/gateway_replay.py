@@ -0,0 +1,566 @@
+# tools/gateway_replay.py
+#
+# Load-tests the full bot (main.create_bot with every cog) offline. Gateway events are fed
+# straight into the client's parsers (bot._connection.parse_*), and bot.http.request is
+# replaced by FakeDiscord, which answers REST calls from its own model of one guild and emits
+# the gateway events Discord would send back (channel creates, voice moves, ...).
+#
+#   python -m tools.gateway_replay counting --users 50 --messages 1000 --rate 100
+#   python -m tools.gateway_replay raid --members 500 --rate 100
+#   python -m tools.gateway_replay voice --members 100 --cycles 3 --rate 50
+#   python -m tools.gateway_replay all --latency 0.1
+#   python -m tools.gateway_replay events --events recorded.jsonl
+#
+# Event streams are JSON lines of {"at": seconds, "event": "MESSAGE_CREATE", "data": {...}}.
+# --dump writes a scenario's synthetic stream in that format so it can be replayed or edited.
+# Payload fields the handlers don't care about (author/member objects, voice session fields,
+# guild_id) are filled in by FakeDiscord.feed, so recorded events can be as small as
+# {"channel_id": "101", "author_id": 10001, "content": "1"}.
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import re
+import shutil
+import sys
+import tempfile
+import time
+from collections import Counter
+from types import SimpleNamespace
+
+import discord
+from discord.http import Route
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+GUILD_ID = 100
+BOT_ID = 1
+COUNTING_CHANNEL_ID = 101
+WELCOME_CHANNEL_ID = 102
+VOICE_CATEGORY_ID = 103
+ENTRY_CHANNEL_ID = 104
+BASE_CHANNEL_IDS = {COUNTING_CHANNEL_ID, WELCOME_CHANNEL_ID, VOICE_CATEGORY_ID, ENTRY_CHANNEL_ID}
+FIRST_USER_ID = 10_000
+
+MESSAGE_DEFAULTS = {
+    "type": 0, "content": "", "attachments": [], "embeds": [], "mentions": [], "mention_roles": [],
+    "mention_everyone": False, "pinned": False, "tts": False, "edited_timestamp": None, "flags": 0, "components": [],
+}
+VOICE_DEFAULTS = {
+    "session_id": "replay", "deaf": False, "mute": False, "self_deaf": False, "self_mute": False,
+    "self_video": False, "suppress": False, "request_to_speak_timestamp": None,
+}
+
+
+def user_payload(user_id: int, bot: bool = False) -> dict:
+    return {"id": str(user_id), "username": f"user{user_id}", "discriminator": "0", "global_name": None, "avatar": None, "bot": bot}
+
+
+def member_payload(user_id: int, bot: bool = False) -> dict:
+    return {
+        "user": user_payload(user_id, bot), "roles": [], "joined_at": discord.utils.utcnow().isoformat(),
+        "deaf": False, "mute": False, "flags": 0,
+    }
+
+
+def channel_payload(channel_id: int, name: str, channel_type: int, parent_id=None, overwrites=None) -> dict:
+    return {
+        "id": str(channel_id), "guild_id": str(GUILD_ID), "name": name, "type": channel_type, "position": 0,
+        "parent_id": str(parent_id) if parent_id else None, "permission_overwrites": overwrites or [],
+        "nsfw": False, "bitrate": 64000, "user_limit": 0, "rtc_region": None,
+    }
+
+
+def http_error(cls, status: int, code: int, message: str):
+    return cls(SimpleNamespace(status=status, reason=message), {"code": code, "message": message})
+
+
+class FakeDiscord:
+    """Discord's side of the connection: answers REST calls and emits the gateway events they cause."""
+
+    def __init__(self, bot, latency: float = 0.05, seed=None):
+        self.bot = bot
+        self.state = bot._connection
+        self.latency = latency
+        self.random = random.Random(seed)
+        self.calls = Counter()  # {(method, path template): count}
+        self.unhandled = Counter()
+        self.in_flight = 0
+        self.messages = []  # (channel_id, json payload) for everything the bot sent
+        self.channels = {}  # {channel_id: channel payload}
+        self.voice = {}  # {user_id: channel_id}
+        self.counter = 0
+        self.handlers = {
+            ("POST", "/channels/{channel_id}/messages"): self.send_message,
+            ("DELETE", "/channels/{channel_id}/messages/{message_id}"): self.no_content,
+            ("PUT", "/channels/{channel_id}/messages/{message_id}/reactions/{emoji}/@me"): self.no_content,
+            ("POST", "/guilds/{guild_id}/channels"): self.create_channel,
+            ("PATCH", "/channels/{channel_id}"): self.edit_channel,
+            ("DELETE", "/channels/{channel_id}"): self.delete_channel,
+            ("PATCH", "/guilds/{guild_id}/members/{user_id}"): self.edit_member,
+        }
+
+    def snowflake(self) -> int:
+        self.counter += 1
+        return discord.utils.time_snowflake(discord.utils.utcnow()) + self.counter
+
+    def connect(self):
+        """Swap in the fake REST layer and load the guild as if GUILD_CREATE had arrived."""
+        self.bot.http.request = self.request
+        self.state.user = discord.ClientUser(state=self.state, data=user_payload(BOT_ID, bot=True))
+        for payload in (
+            channel_payload(COUNTING_CHANNEL_ID, "counting", 0),
+            channel_payload(WELCOME_CHANNEL_ID, "welcome", 0),
+            channel_payload(VOICE_CATEGORY_ID, "Voice", 4),
+            channel_payload(ENTRY_CHANNEL_ID, "Join to Create", 2, parent_id=VOICE_CATEGORY_ID),
+        ):
+            self.channels[int(payload["id"])] = payload
+        self.state._add_guild_from_data({
+            "id": str(GUILD_ID), "name": "Replay Guild", "owner_id": str(BOT_ID),
+            "roles": [{
+                "id": str(GUILD_ID), "name": "@everyone", "permissions": "0", "position": 0, "color": 0,
+                "hoist": False, "managed": False, "mentionable": False, "flags": 0,
+            }],
+            "channels": list(self.channels.values()), "members": [member_payload(BOT_ID, bot=True)],
+            "voice_states": [], "member_count": 1, "features": [], "emojis": [], "stickers": [],
+        })
+        self.bot._ready.set()
+
+    # ───── GATEWAY ───────────────────────────────────────
+
+    def feed(self, event: str, data: dict):
+        data = dict(data)
+        data.setdefault("guild_id", str(GUILD_ID))
+        if event == "MESSAGE_CREATE":
+            author_id = int(data.pop("author_id", 0) or data["author"]["id"])
+            data.setdefault("id", str(self.snowflake()))
+            data.setdefault("author", user_payload(author_id))
+            data.setdefault("member", {k: v for k, v in member_payload(author_id).items() if k != "user"})
+            data.setdefault("timestamp", discord.utils.utcnow().isoformat())
+            for key, value in MESSAGE_DEFAULTS.items():
+                data.setdefault(key, value)
+        elif event == "GUILD_MEMBER_ADD":
+            user_id = int(data.pop("user_id", 0) or data["user"]["id"])
+            for key, value in member_payload(user_id).items():
+                data.setdefault(key, value)
+        elif event == "VOICE_STATE_UPDATE":
+            user_id = int(data["user_id"])
+            data.setdefault("member", member_payload(user_id))
+            for key, value in VOICE_DEFAULTS.items():
+                data.setdefault(key, value)
+            if data.get("channel_id"):
+                self.voice[user_id] = int(data["channel_id"])
+            else:
+                self.voice.pop(user_id, None)
+        getattr(self.state, f"parse_{event.lower()}")(data)
+
+    def set_voice(self, user_id: int, channel_id):
+        self.feed("VOICE_STATE_UPDATE", {"user_id": str(user_id), "channel_id": str(channel_id) if channel_id else None})
+
+    # ───── REST ──────────────────────────────────────────
+
+    async def request(self, route: Route, *, files=None, form=None, **kwargs):
+        key = (route.method, route.path)
+        self.calls[key] += 1
+        self.in_flight += 1
+        try:
+            await asyncio.sleep(self.latency * self.random.uniform(0.5, 1.5))
+        finally:
+            self.in_flight -= 1
+
+        handler = self.handlers.get(key)
+        if handler is None:
+            self.unhandled[key] += 1
+            return None
+        names = re.findall(r"{(\w+)}", route.path)
+        match = re.fullmatch(re.sub(r"{\w+}", "([^/]+)", route.path), route.url[len(Route.BASE):])
+        return handler(dict(zip(names, match.groups())), kwargs.get("json") or {})
+
+    def no_content(self, params, payload):
+        return None
+
+    def send_message(self, params, payload):
+        channel_id = int(params["channel_id"])
+        self.messages.append((channel_id, payload))
+        return {
+            **MESSAGE_DEFAULTS, "id": str(self.snowflake()), "channel_id": str(channel_id),
+            "author": user_payload(BOT_ID, bot=True), "content": payload.get("content") or "",
+            "embeds": payload.get("embeds") or [], "timestamp": discord.utils.utcnow().isoformat(),
+        }
+
+    def create_channel(self, params, payload):
+        channel_id = self.snowflake()
+        data = channel_payload(
+            channel_id, payload["name"], payload["type"], payload.get("parent_id"), payload.get("permission_overwrites")
+        )
+        self.channels[channel_id] = data
+        self.state.parse_channel_create(data)
+        return data
+
+    def edit_channel(self, params, payload):
+        data = self.channels.get(int(params["channel_id"]))
+        if data is None:
+            raise http_error(discord.NotFound, 404, 10003, "Unknown Channel")
+        for key in ("name", "permission_overwrites", "parent_id"):
+            if key in payload:
+                data[key] = str(payload[key]) if key == "parent_id" and payload[key] else payload[key]
+        self.state.parse_channel_update(data)
+        return data
+
+    def delete_channel(self, params, payload):
+        channel_id = int(params["channel_id"])
+        data = self.channels.pop(channel_id, None)
+        if data is None:
+            raise http_error(discord.NotFound, 404, 10003, "Unknown Channel")
+        for user_id in [user for user, channel in self.voice.items() if channel == channel_id]:
+            self.set_voice(user_id, None)
+        self.state.parse_channel_delete(data)
+        return data
+
+    def edit_member(self, params, payload):
+        user_id = int(params["user_id"])
+        if "channel_id" in payload:
+            if user_id not in self.voice:
+                raise http_error(discord.HTTPException, 400, 40032, "Target user is not connected to voice.")
+            self.set_voice(user_id, payload["channel_id"])
+        return member_payload(user_id)
+
+
+# ───── SCENARIOS ─────────────────────────────────────────
+
+class CountingModel:
+    """CountingGame's rules applied to messages in arrival order; the expected end state."""
+
+    def __init__(self):
+        self.count = 0
+        self.last = None
+        self.scores = Counter()
+        self.breaks = 0
+
+    def apply(self, user_id: int, content: str):
+        content = content.strip()
+        if not content.isdigit():
+            return
+        number = int(content)
+        if number != self.count + 1 or user_id == self.last:
+            self.count, self.last = 0, None
+            self.breaks += 1
+        else:
+            self.count, self.last = number, user_id
+            self.scores[user_id] += 1
+
+
+def counting_race(args, rng) -> list[dict]:
+    """Users take turns counting; now and then a second user races the first to the same number."""
+    users = [FIRST_USER_ID + i for i in range(args.users)]
+    model = CountingModel()
+    events = []
+    at = 0.0
+    while len(events) < args.messages:
+        number = model.count + 1
+        racers = [rng.choice([user for user in users if user != model.last])]
+        if rng.random() < args.race:
+            racers.append(rng.choice(users))
+        for offset, user in enumerate(racers):
+            events.append({
+                "at": at + offset * 0.002, "event": "MESSAGE_CREATE",
+                "data": {"channel_id": str(COUNTING_CHANNEL_ID), "author_id": user, "content": str(number)},
+            })
+            model.apply(user, str(number))
+        at += 1 / args.rate
+    return events
+
+
+def join_raid(args, rng) -> list[dict]:
+    return [
+        {"at": i / args.rate, "event": "GUILD_MEMBER_ADD", "data": {"user_id": FIRST_USER_ID + 50_000 + i}}
+        for i in range(args.members)
+    ]
+
+
+def voice_churn(args, rng) -> list[dict]:
+    """Members repeatedly join the entry channel, sit in their temp VC for a bit and leave.
+
+    Some join twice in quick succession to exercise the per-member single-flight.
+    """
+    events = []
+
+    def voice(at, user, channel_id):
+        events.append({
+            "at": at, "event": "VOICE_STATE_UPDATE",
+            "data": {"user_id": str(user), "channel_id": str(channel_id) if channel_id else None},
+        })
+
+    for i in range(args.members):
+        user = FIRST_USER_ID + 100_000 + i
+        at = rng.uniform(0, args.members / args.rate)
+        for _ in range(args.cycles):
+            voice(at, user, ENTRY_CHANNEL_ID)
+            if rng.random() < 0.2:
+                voice(at + 0.01, user, None)
+                voice(at + 0.02, user, ENTRY_CHANNEL_ID)
+            at += rng.uniform(0.5, 3.0)
+            voice(at, user, None)
+            at += rng.uniform(0.2, 2.0)
+    return sorted(events, key=lambda event: event["at"])
+
+
+SCENARIOS = {"counting": counting_race, "raid": join_raid, "voice": voice_churn}
+
+
+def load_events(path: str) -> list[dict]:
+    with open(path, encoding="utf-8") as f:
+        return sorted((json.loads(line) for line in f if line.strip()), key=lambda event: event["at"])
+
+
+# ───── CHECKS ────────────────────────────────────────────
+
+def check_counting(bot, events) -> list[tuple[bool, str]]:
+    from database.config_store import get_config
+    from database.stats_store import get_user_stat
+    from database.counting_store import get_recent_runs
+
+    model = CountingModel()
+    for event in events:
+        data = event["data"]
+        if event["event"] == "MESSAGE_CREATE" and int(data["channel_id"]) == COUNTING_CHANNEL_ID:
+            model.apply(int(data.get("author_id") or data["author"]["id"]), data.get("content", ""))
+    if not model.scores and not model.breaks:
+        return []
+
+    count = get_config("current_count") or 0
+    last = get_config("last_counter_id")
+    wrong_scores = [user for user, score in model.scores.items() if get_user_stat(user, "counting_score") != score]
+    runs = len(get_recent_runs(model.breaks + 10))
+    return [
+        (count == model.count, f"counting: current_count {count}, expected {model.count}"),
+        (last == model.last, f"counting: last_counter_id {last}, expected {model.last}"),
+        (not wrong_scores, f"counting: {len(wrong_scores)} of {len(model.scores)} user score(s) differ from the model"),
+        (runs == model.breaks, f"counting: {runs} run summaries, expected {model.breaks} break(s)"),
+    ]
+
+
+def check_welcome(fake, events) -> list[tuple[bool, str]]:
+    joined = [
+        int(event["data"].get("user_id") or event["data"]["user"]["id"])
+        for event in events if event["event"] == "GUILD_MEMBER_ADD"
+    ]
+    if not joined:
+        return []
+
+    sends = [payload.get("content") or "" for channel_id, payload in fake.messages if channel_id == WELCOME_CHANNEL_ID]
+    mentioned = Counter(int(user) for content in sends for user in re.findall(r"<@!?(\d+)>", content))
+    missing = [user for user in joined if mentioned[user] == 0]
+    repeated = [user for user, times in mentioned.items() if times > 1]
+    return [
+        (not missing, f"welcome: {len(joined) - len(missing)}/{len(joined)} joins welcomed in {len(sends)} message(s)"),
+        (not repeated, f"welcome: {len(repeated)} member(s) welcomed more than once"),
+    ]
+
+
+def check_voice(bot, fake, events) -> list[tuple[bool, str]]:
+    if not any(event["event"] == "VOICE_STATE_UPDATE" for event in events):
+        return []
+
+    from database.config_store import get_config
+
+    registry = bot.get_cog("VoiceManager").registry
+    occupied = set(fake.voice.values())
+    temp_channels = {channel_id for channel_id in fake.channels if channel_id not in BASE_CHANNEL_IDS}
+    untracked = temp_channels - set(registry.owner_by_channel)
+    missing = set(registry.owner_by_channel) - temp_channels
+    empty_owned = [
+        channel_id for channel_id in registry.owner_by_channel
+        if registry.is_owned(channel_id) and channel_id not in occupied
+    ]
+    stuck = [user for user, channel_id in fake.voice.items() if channel_id == ENTRY_CHANNEL_ID]
+    pooled = len(registry.pooled(GUILD_ID))
+    pool_size = get_config("voice_pool_size") or 0
+    return [
+        (not untracked, f"voice: {len(untracked)} temp channel(s) exist that the registry doesn't know about"),
+        (not missing, f"voice: {len(missing)} registry entr(ies) for channels that no longer exist"),
+        (not empty_owned, f"voice: {len(empty_owned)} empty temp channel(s) left behind"),
+        (not stuck, f"voice: {len(stuck)} member(s) left sitting in the entry channel"),
+        (pooled == pool_size, f"voice: {pooled} pooled channel(s), pool size {pool_size}"),
+    ]
+
+
+# ───── RUNNER ────────────────────────────────────────────
+
+async def settle(bot, fake, timeout: float):
+    """Wait for in-flight handlers, batching windows, expiry timers and pool refills, then flush buffered writes.
+
+    Work between two REST calls of one task is invisible here, so the bot has to look idle twice in a row.
+    """
+    welcome = bot.get_cog("Welcome")
+    voice = bot.get_cog("VoiceManager")
+    deadline = time.monotonic() + timeout
+    idle_polls = 0
+    while time.monotonic() < deadline and idle_polls < 2:
+        await asyncio.sleep(0.25)
+        busy = (
+            fake.in_flight
+            # discord.py names the task of every dispatched event "discord.py: <event>".
+            or any(task.get_name().startswith("discord.py:") and not task.done() for task in asyncio.all_tasks())
+            or (welcome and (welcome.pending or welcome.flush_tasks))
+            or (voice and (
+                voice.join_flights or voice.expiry_timers or any(not task.done() for task in voice.refill_tasks.values())
+            ))
+        )
+        idle_polls = 0 if busy else idle_polls + 1
+    counting = bot.get_cog("CountingGame")
+    if counting:
+        await counting.write_pending_events()
+
+
+async def replay(fake, events):
+    started = time.monotonic()
+    for event in events:
+        delay = started + event["at"] - time.monotonic()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        fake.feed(event["event"], event["data"])
+    return time.monotonic() - started
+
+
+def report(name, events, elapsed, fake, checks):
+    from utils.metrics import registry
+
+    print(f"\n═══ {name}: {len(events)} event(s) in {elapsed:.1f}s ({len(events) / max(elapsed, 1e-9):.0f}/s)")
+
+    handlers = registry.histograms.get("bot_handler_seconds", {})
+    errors = registry.counters.get("bot_handler_errors_total", {})
+    print("Handlers (percentiles over the last 1024 calls each):")
+    for labels, histogram in sorted(handlers.items(), key=lambda item: item[1].sum, reverse=True):
+        label_map = dict(labels)
+        print(
+            f"  {label_map['kind']:<12} {label_map['name']:<40} calls {histogram.count:>6}  "
+            f"p50 {histogram.percentile(50) * 1000:7.1f}ms  p95 {histogram.percentile(95) * 1000:7.1f}ms  "
+            f"p99 {histogram.percentile(99) * 1000:7.1f}ms  max {histogram.max * 1000:7.1f}ms  "
+            f"errors {errors.get(labels, 0):.0f}"
+        )
+
+    lag = registry.histograms.get("bot_event_loop_lag_seconds", {}).get(())
+    if lag:
+        print(
+            f"Event loop lag: p50 {lag.percentile(50) * 1000:.1f}ms, p95 {lag.percentile(95) * 1000:.1f}ms, "
+            f"max {lag.max * 1000:.1f}ms"
+        )
+
+    print(f"REST calls: {sum(fake.calls.values())}")
+    for (method, path), count in fake.calls.most_common():
+        print(f"  {count:>6}  {method:<6} {path}")
+    for (method, path), count in fake.unhandled.items():
+        print(f"  ⚠️ {count} call(s) to {method} {path} had no fake handler")
+
+    print("Checks:")
+    for ok, text in checks:
+        print(f"  {'✅' if ok else '❌'} {text}")
+    if not checks:
+        print("  (nothing to check for this stream)")
+
+
+async def run(args) -> int:
+    import main as bot_main
+    from database.config_store import set_config
+    from utils.metrics import registry
+
+    bot = bot_main.create_bot()
+    await bot._async_setup_hook()
+    fake = FakeDiscord(bot, latency=args.latency, seed=args.seed)
+    fake.connect()
+    await bot.setup_hook()
+
+    set_config("counting_channel_id", COUNTING_CHANNEL_ID)
+    set_config("welcome_enabled", True)
+    set_config("welcome_channel_id", WELCOME_CHANNEL_ID)
+    set_config("voice_entry_channel_id", ENTRY_CHANNEL_ID)
+    set_config("voice_pool_size", args.pool)
+
+    if args.scenario == "events":
+        streams = [("events", load_events(args.events))]
+    else:
+        names = list(SCENARIOS) if args.scenario == "all" else [args.scenario]
+        rng = random.Random(args.seed)
+        streams = [(name, SCENARIOS[name](args, rng)) for name in names]
+
+    failed = False
+    try:
+        for name, events in streams:
+            if args.dump:
+                path = args.dump if len(streams) == 1 else f"{args.dump}.{name}"
+                with open(path, "w", encoding="utf-8") as f:
+                    f.writelines(json.dumps(event) + "\n" for event in events)
+
+            registry.histograms.clear()
+            registry.counters.clear()
+            fake.calls.clear()
+            fake.unhandled.clear()
+            fake.messages.clear()
+
+            elapsed = await replay(fake, events)
+            await settle(bot, fake, args.settle)
+            checks = check_counting(bot, events) + check_welcome(fake, events) + check_voice(bot, fake, events)
+            report(name, events, elapsed, fake, checks)
+            failed = failed or not all(ok for ok, _ in checks)
+    finally:
+        bot.health_task.cancel()
+        bot.scheduler.close()
+        for cog in list(bot.cogs):
+            await bot.remove_cog(cog)
+
+    return 1 if failed else 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Replay gateway events through the whole bot against a fake Discord.")
+    parser.add_argument("scenario", choices=[*SCENARIOS, "all", "events"])
+    parser.add_argument("--events", help="JSON lines event stream to replay (with the 'events' scenario)")
+    parser.add_argument("--dump", help="Write the generated event stream to this file")
+    parser.add_argument("--rate", type=float, default=100, help="Events per second for synthetic streams")
+    parser.add_argument("--users", type=int, default=50, help="Counting: users taking part")
+    parser.add_argument("--messages", type=int, default=1000, help="Counting: messages to send")
+    parser.add_argument("--race", type=float, default=0.05, help="Counting: chance a second user races for a number")
+    parser.add_argument("--members", type=int, default=None, help="Raid: members joining (500); voice: members churning (100)")
+    parser.add_argument("--cycles", type=int, default=3, help="Voice: join/leave cycles per member")
+    parser.add_argument("--pool", type=int, default=2, help="Voice: voice_pool_size to configure")
+    parser.add_argument("--latency", type=float, default=0.05, help="Fake REST response time in seconds")
+    parser.add_argument("--settle", type=float, default=60, help="Max seconds to wait for timers after the stream")
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args(argv)
+    if args.scenario == "events" and not args.events:
+        parser.error("the events scenario needs --events")
+    if args.members is None:
+        args.members = 100 if args.scenario == "voice" else 500
+
+    # Every store uses paths relative to the working directory, so run in a scratch directory
+    # that only borrows the cogs folder; nothing is written next to the real settings.db.
+    if REPO_ROOT not in sys.path:
+        sys.path.insert(0, REPO_ROOT)
+    if args.events:
+        args.events = os.path.abspath(args.events)
+    if args.dump:
+        args.dump = os.path.abspath(args.dump)
+    scratch = tempfile.mkdtemp(prefix="gateway-replay-")
+    os.symlink(os.path.join(REPO_ROOT, "cogs"), os.path.join(scratch, "cogs"))
+    cwd = os.getcwd()
+    os.chdir(scratch)
+
+    os.environ.setdefault("DEVELOPER_ID", str(BOT_ID))
+    os.environ.setdefault("GUILD_ID", str(GUILD_ID))
+    os.environ.setdefault("REDDIT_CHANNEL_ID", "0")
+    os.environ.setdefault("LOG_LEVEL", "WARNING")
+    os.environ["METRICS_PORT"] = ""
+    os.environ["SHARD_MODE"] = "single"
+
+    try:
+        return asyncio.run(run(args))
+    finally:
+        os.chdir(cwd)
+        shutil.rmtree(scratch, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
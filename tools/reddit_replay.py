@@ -0,0 +1,187 @@
+# tools/reddit_replay.py
+#
+# Drives RedditMirror.check_reddit against tools/fake_reddit.py and a fake Discord channel, fully offline.
+#
+#   python -m tools.reddit_replay --posts 500 --arrivals 3 --ticks 100 --latency 0.2
+#   python -m tools.reddit_replay --listing recorded_new.json --error-rate 0.05
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+import discord
+
+from tools.fake_reddit import FakeReddit, load_posts, synthetic_posts
+
+FAKE_CHANNEL_ID = 1
+
+
+class FakeTextChannel(discord.TextChannel):
+    """Passes RedditMirror's isinstance check but keeps sends in memory."""
+
+    def __init__(self, channel_id: int, send_latency: float = 0.0):
+        self.id = channel_id
+        self.sent = []
+        self.send_latency = send_latency
+
+    async def send(self, content=None, **kwargs):
+        if self.send_latency:
+            await asyncio.sleep(self.send_latency)
+        self.sent.append((content, kwargs))
+
+    def __repr__(self):
+        return f"<FakeTextChannel id={self.id} sent={len(self.sent)}>"
+
+
+class FakeBot:
+    def __init__(self, channel):
+        self.channel = channel
+
+    def get_channel(self, channel_id):
+        return self.channel if channel_id == self.channel.id else None
+
+    async def wait_until_ready(self):
+        return
+
+
+class StallMonitor:
+    """Measures how late a short periodic sleep wakes up; the overshoot is time the loop was blocked."""
+
+    def __init__(self, interval: float = 0.005, threshold: float = 0.01):
+        self.interval = interval
+        self.threshold = threshold
+        self.max_stall = 0.0
+        self.total_stall = 0.0
+        self.stalls = 0
+        self._task = None
+
+    async def _run(self):
+        while True:
+            start = time.perf_counter()
+            await asyncio.sleep(self.interval)
+            lag = time.perf_counter() - start - self.interval
+            if lag >= self.threshold:
+                self.stalls += 1
+                self.total_stall += lag
+            self.max_stall = max(self.max_stall, lag)
+
+    def start(self):
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+async def replay(args):
+    from database import config_store
+    from cogs.reddit_mirror import RedditMirror
+
+    config_store.init_config_db()
+    config_store.set_config("reddit_enabled", True)
+    config_store.set_config("reddit_min_upvotes", args.min_upvotes)
+
+    posts = load_posts(args.listing) if args.listing else synthetic_posts(
+        args.posts, gallery_ratio=args.gallery_ratio, images_per_gallery=args.gallery_size, seed=args.seed
+    )
+    backend = FakeReddit(
+        posts, latency=args.latency, jitter=args.jitter, error_rate=args.error_rate,
+        budget=args.budget, seed=args.seed
+    )
+    channel = FakeTextChannel(FAKE_CHANNEL_ID, send_latency=args.send_latency)
+    # Constructed without add_cog, so no scheduler job is registered; the harness calls iterations itself.
+    cog = RedditMirror(FakeBot(channel), reddit=backend)
+
+    monitor = StallMonitor()
+    monitor.start()
+
+    tick_seconds = []
+    posts_per_tick = []
+    eligible = 0
+    started = time.perf_counter()
+
+    for _ in range(args.ticks):
+        before = len(channel.sent)
+        arrived = backend.visible[:backend.arrive(args.arrivals)]
+        eligible += sum(1 for s in arrived if s.score >= args.min_upvotes)
+
+        tick_start = time.perf_counter()
+        await cog.check_reddit()
+        tick_seconds.append(time.perf_counter() - tick_start)
+        posts_per_tick.append(len(channel.sent) - before)
+
+        if args.interval:
+            await asyncio.sleep(args.interval)
+
+    elapsed = time.perf_counter() - started
+    await monitor.stop()
+
+    posted = len(channel.sent)
+    galleries = sum(1 for _, kwargs in channel.sent if kwargs.get("view") is not None)
+
+    print(f"Ticks:              {args.ticks} in {elapsed:.2f}s")
+    print(f"Reddit requests:    {backend.requests} ({backend.failures} failed)")
+    print(f"Eligible arrivals:  {eligible}")
+    print(f"Posted:             {posted} ({galleries} galleries), {max(0, eligible - posted)} missed")
+    print(f"Throughput:         {posted / elapsed:.1f} posts/s")
+    print(f"Posts per tick:     avg {statistics.mean(posts_per_tick):.2f}, max {max(posts_per_tick)}")
+    print(
+        f"Tick latency:       p50 {percentile(tick_seconds, 50) * 1000:.1f}ms, "
+        f"p95 {percentile(tick_seconds, 95) * 1000:.1f}ms, max {max(tick_seconds) * 1000:.1f}ms"
+    )
+    print(
+        f"Event loop stalls:  {monitor.stalls} over {monitor.threshold * 1000:.0f}ms, "
+        f"total {monitor.total_stall * 1000:.1f}ms, worst {monitor.max_stall * 1000:.1f}ms"
+    )
+    for endpoint, stats in cog.reddit.endpoints.items():
+        print(
+            f"Endpoint {endpoint}: {stats.calls} call(s), {stats.errors} error(s), "
+            f"avg {stats.avg_seconds * 1000:.1f}ms, skipped polls {cog.reddit.skipped_polls}"
+        )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Replay a Reddit listing through RedditMirror offline.")
+    parser.add_argument("--listing", help="Recorded /new.json listing or JSON list of posts")
+    parser.add_argument("--posts", type=int, default=200, help="Synthetic posts to generate")
+    parser.add_argument("--gallery-ratio", type=float, default=0.3)
+    parser.add_argument("--gallery-size", type=int, default=5, help="Images per synthetic gallery")
+    parser.add_argument("--ticks", type=int, default=50)
+    parser.add_argument("--arrivals", type=int, default=3, help="New posts released before each tick")
+    parser.add_argument("--interval", type=float, default=0.0, help="Seconds to wait between ticks")
+    parser.add_argument("--latency", type=float, default=0.05, help="Fake Reddit response time in seconds")
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--budget", type=int, default=1000, help="Requests per fake rate limit window")
+    parser.add_argument("--send-latency", type=float, default=0.0, help="Fake Discord send time in seconds")
+    parser.add_argument("--min-upvotes", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args(argv)
+
+    os.environ.setdefault("REDDIT_SUBREDDIT", "fake")
+    os.environ["REDDIT_CHANNEL_ID"] = str(FAKE_CHANNEL_ID)
+
+    from database import config_store
+
+    with tempfile.TemporaryDirectory() as tmp:
+        config_store.DB_PATH = os.path.join(tmp, "settings.db")
+        asyncio.run(replay(args))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,33 @@
+# utils/command_sync.py
+
+import hashlib
+import json
+
+from database.config_store import get_config, set_config
+
+
+def scope_key(guild=None) -> str:
+    return f"command_tree_hash:{guild.id}" if guild else "command_tree_hash:global"
+
+
+def tree_hash(tree, guild=None) -> str:
+    """Stable hash of the payload `tree.sync()` would upload for this scope."""
+    payload = [command.to_dict(tree) for command in tree.get_commands(guild=guild)]
+    payload.sort(key=lambda command: (command.get("type", 1), command["name"]))
+    encoded = json.dumps(payload, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+async def sync_commands(tree, guild=None, force: bool = False):
+    """Sync one scope only if its command tree changed since the last sync.
+
+    Returns the synced commands, or None when the stored hash matched and no request was made.
+    """
+    digest = tree_hash(tree, guild=guild)
+    key = scope_key(guild)
+    if not force and get_config(key) == digest:
+        return None
+
+    synced = await tree.sync(guild=guild)
+    set_config(key, digest)
+    return synced
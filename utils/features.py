@@ -0,0 +1,54 @@
+# utils/features.py
+
+import discord
+
+# Every cog needs guild/channel/role events to resolve the channels it is configured with.
+BASE_INTENTS = ["guilds"]
+
+# What each cog needs from the gateway. "member_cache" names MemberCacheFlags to enable.
+COG_REQUIREMENTS = {
+    "counting_game": {"intents": ["guild_messages", "message_content"]},
+    "welcome": {"intents": ["members"]},
+    "voice_manager": {"intents": ["voice_states"], "member_cache": ["voice"]},
+    "reddit_mirror": {},
+    "dune_news": {},
+    "config_menu": {},
+    "settings": {},
+    "devtools": {},
+    "bot_stats": {},
+    "backup": {},
+}
+
+
+def build_intents(cogs: list[str]) -> discord.Intents:
+    intents = discord.Intents.none()
+    for name in BASE_INTENTS:
+        setattr(intents, name, True)
+    for cog in cogs:
+        for name in COG_REQUIREMENTS.get(cog, {}).get("intents", []):
+            setattr(intents, name, True)
+    return intents
+
+
+def build_member_cache_flags(cogs: list[str]) -> discord.MemberCacheFlags:
+    # The bot's own member is always cached; anything else is opt-in per cog.
+    flags = discord.MemberCacheFlags.none()
+    for cog in cogs:
+        for name in COG_REQUIREMENTS.get(cog, {}).get("member_cache", []):
+            setattr(flags, name, True)
+    return flags
+
+
+def requirements_report(cogs: list[str]) -> list[str]:
+    lines = []
+    for cog in cogs:
+        requirements = COG_REQUIREMENTS.get(cog)
+        if requirements is None:
+            lines.append(f"{cog}: no entry in COG_REQUIREMENTS, assuming base intents only")
+            continue
+        intents = ", ".join(requirements.get("intents", [])) or "base only"
+        line = f"{cog}: {intents}"
+        if requirements.get("member_cache"):
+            line += f" (member cache: {', '.join(requirements['member_cache'])})"
+        lines.append(line)
+    return lines
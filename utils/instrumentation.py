@@ -0,0 +1,70 @@
+# utils/instrumentation.py
+
+import asyncio
+import time
+
+import discord
+from discord import app_commands
+from discord.ext import commands
+
+from utils.metrics import record_handler
+
+
+class InstrumentedTree(app_commands.CommandTree):
+    """Records latency and failures for every slash command."""
+
+    async def interaction_check(self, interaction: discord.Interaction) -> bool:
+        interaction.extras["metrics_started"] = time.perf_counter()
+        return True
+
+    async def on_error(self, interaction: discord.Interaction, error: app_commands.AppCommandError):
+        record_app_command(interaction, failed=True)
+        await super().on_error(interaction, error)
+
+
+def record_app_command(interaction: discord.Interaction, failed: bool = False):
+    started = interaction.extras.pop("metrics_started", None)
+    if started is None or interaction.command is None:
+        return
+    record_handler("app_command", interaction.command.qualified_name, time.perf_counter() - started, failed)
+
+
+class InstrumentedBotMixin:
+    """Times every event listener the bot runs.
+
+    Overrides Client._run_event, which discord.py uses to run each listener for a dispatched
+    event; the body mirrors the upstream implementation with timing added around it.
+    """
+
+    def __init__(self, *args, **kwargs):
+        kwargs.setdefault("tree_cls", InstrumentedTree)
+        super().__init__(*args, **kwargs)
+        self.add_listener(self.record_app_command_completion, "on_app_command_completion")
+
+    async def record_app_command_completion(self, interaction: discord.Interaction, command):
+        record_app_command(interaction)
+
+    async def _run_event(self, coro, event_name: str, *args, **kwargs) -> None:
+        name = getattr(coro, "__qualname__", event_name)
+        start = time.perf_counter()
+        failed = False
+        try:
+            await coro(*args, **kwargs)
+        except asyncio.CancelledError:
+            pass
+        except Exception:
+            failed = True
+            try:
+                await self.on_error(event_name, *args, **kwargs)
+            except asyncio.CancelledError:
+                pass
+        finally:
+            record_handler("listener", name, time.perf_counter() - start, failed)
+
+
+class InstrumentedBot(InstrumentedBotMixin, commands.Bot):
+    pass
+
+
+class InstrumentedAutoShardedBot(InstrumentedBotMixin, commands.AutoShardedBot):
+    pass
@@ -0,0 +1,104 @@
+# utils/logging_setup.py
+
+import atexit
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+import threading
+import time
+
+LOG_FORMAT = "%(asctime)s %(levelname)-8s %(name)s: %(message)s"
+RATE_LIMIT_WINDOW_SECONDS = 60
+
+_listener = None
+
+
+class DeferredQueueHandler(logging.handlers.QueueHandler):
+    """Queues records without formatting them; the listener thread does the formatting and I/O.
+
+    The stock QueueHandler formats in the caller so records can be pickled across processes.
+    Our queue never leaves this process, so only the message is bound here (args may be
+    mutated later) and timestamps and tracebacks are rendered on the listener thread.
+    """
+
+    def prepare(self, record):
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+
+class RateLimitFilter(logging.Filter):
+    """Lets the first occurrence of a message template through per window and counts the rest.
+
+    The next occurrence after the window closes carries a note with how many were dropped.
+    """
+
+    def __init__(self, window: float = RATE_LIMIT_WINDOW_SECONDS):
+        super().__init__()
+        self.window = window
+        self.seen = {}  # {(logger, level, template): [window_start, suppressed]}
+        self.lock = threading.Lock()
+
+    def filter(self, record) -> bool:
+        if record.levelno < logging.WARNING:
+            return True
+
+        key = (record.name, record.levelno, str(record.msg))
+        now = time.monotonic()
+        with self.lock:
+            entry = self.seen.get(key)
+            if entry is None or now - entry[0] >= self.window:
+                suppressed = entry[1] if entry else 0
+                self.seen[key] = [now, 0]
+                if len(self.seen) > 10000:
+                    self.seen = {k: v for k, v in self.seen.items() if now - v[0] < self.window}
+                if suppressed:
+                    record.msg = f"{record.msg} (suppressed {suppressed} similar in the last {self.window:.0f}s)"
+                return True
+            entry[1] += 1
+            return False
+
+
+def parse_levels(value: str) -> dict:
+    """Parse LOG_LEVELS, e.g. "cogs.reddit_mirror=DEBUG,discord.gateway=WARNING"."""
+    levels = {}
+    for part in value.split(","):
+        if "=" in part:
+            name, level = part.split("=", 1)
+            levels[name.strip()] = level.strip().upper()
+    return levels
+
+
+def setup_logging():
+    """Route all logging through a queue so the event loop never blocks on stdout or a log file.
+
+    LOG_LEVEL sets the root level, LOG_LEVELS overrides it per logger, and LOG_FILE adds a
+    rotating file next to stdout.
+    """
+    global _listener
+    if _listener is not None:
+        return
+
+    formatter = logging.Formatter(LOG_FORMAT)
+    handlers = [logging.StreamHandler(sys.stdout)]
+    log_file = os.getenv("LOG_FILE")
+    if log_file:
+        handlers.append(logging.handlers.RotatingFileHandler(log_file, maxBytes=10 * 1024 * 1024, backupCount=5, encoding="utf-8"))
+    for handler in handlers:
+        handler.setFormatter(formatter)
+
+    log_queue = queue.SimpleQueue()
+    queue_handler = DeferredQueueHandler(log_queue)
+    queue_handler.addFilter(RateLimitFilter())
+
+    root = logging.getLogger()
+    root.handlers = [queue_handler]
+    root.setLevel(os.getenv("LOG_LEVEL", "INFO").upper())
+    for name, level in parse_levels(os.getenv("LOG_LEVELS", "")).items():
+        logging.getLogger(name).setLevel(level)
+
+    _listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+    _listener.start()
+    atexit.register(_listener.stop)
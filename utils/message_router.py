@@ -0,0 +1,59 @@
+# utils/message_router.py
+
+import logging
+
+from database.config_store import get_config, add_config_listener, remove_config_listener
+
+log = logging.getLogger(__name__)
+
+
+class MessageRouter:
+    """Single on_message listener that only calls handlers registered for the message's channel.
+
+    Handlers register against a config key holding a channel id; the channel index is rebuilt
+    whenever one of those keys changes, so irrelevant messages cost one dict lookup.
+    """
+
+    def __init__(self, bot):
+        self.bot = bot
+        self.routes = {}  # {config_key: [handler, ...]}
+        self.index = {}  # {channel_id: [handler, ...]}
+        bot.add_listener(self.dispatch, "on_message")
+        add_config_listener(self.on_config_change)
+
+    def close(self):
+        self.bot.remove_listener(self.dispatch, "on_message")
+        remove_config_listener(self.on_config_change)
+
+    def register(self, config_key: str, handler):
+        self.routes.setdefault(config_key, []).append(handler)
+        self.rebuild()
+
+    def unregister(self, handler):
+        for handlers in self.routes.values():
+            if handler in handlers:
+                handlers.remove(handler)
+        self.rebuild()
+
+    def rebuild(self):
+        index = {}
+        for config_key, handlers in self.routes.items():
+            channel_id = get_config(config_key) if handlers else None
+            if channel_id:
+                index.setdefault(int(channel_id), []).extend(handlers)
+        self.index = index
+
+    def on_config_change(self, key: str):
+        if key in self.routes:
+            self.rebuild()
+
+    async def dispatch(self, message):
+        handlers = self.index.get(message.channel.id)
+        if not handlers:
+            return
+
+        for handler in list(handlers):
+            try:
+                await handler(message)
+            except Exception:
+                log.exception("Handler %s failed", handler.__qualname__)
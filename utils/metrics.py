@@ -0,0 +1,137 @@
+# utils/metrics.py
+
+import functools
+import math
+import time
+from collections import deque
+
+# Latency buckets in seconds, Prometheus-style (cumulative, with +Inf implied).
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SAMPLE_SIZE = 1024  # recent observations kept per series for percentiles
+
+
+class Histogram:
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self.bucket_counts = [0] * len(buckets)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+        self.samples = deque(maxlen=SAMPLE_SIZE)
+
+    def observe(self, value: float):
+        self.count += 1
+        self.sum += value
+        self.max = max(self.max, value)
+        self.samples.append(value)
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.bucket_counts[i] += 1
+                break
+
+    def percentile(self, pct: float) -> float:
+        if not self.samples:
+            return 0.0
+        ordered = sorted(self.samples)
+        index = min(len(ordered) - 1, max(0, math.ceil(pct / 100 * len(ordered)) - 1))
+        return ordered[index]
+
+
+class Registry:
+    def __init__(self):
+        self.counters = {}  # {name: {labels: value}}
+        self.gauges = {}  # {name: {labels: value}}
+        self.histograms = {}  # {name: {labels: Histogram}}
+        self.help = {}  # {name: description}
+
+    def describe(self, name: str, text: str):
+        self.help[name] = text
+
+    def inc(self, metric: str, amount: float = 1, **labels):
+        series = self.counters.setdefault(metric, {})
+        key = tuple(sorted(labels.items()))
+        series[key] = series.get(key, 0) + amount
+
+    def set(self, metric: str, value: float, **labels):
+        self.gauges.setdefault(metric, {})[tuple(sorted(labels.items()))] = value
+
+    def observe(self, metric: str, value: float, **labels):
+        series = self.histograms.setdefault(metric, {})
+        key = tuple(sorted(labels.items()))
+        histogram = series.get(key)
+        if histogram is None:
+            histogram = series[key] = Histogram()
+        histogram.observe(value)
+
+    def render(self) -> str:
+        """Render every series in the Prometheus text exposition format."""
+        lines = []
+
+        for kind, families in (("counter", self.counters), ("gauge", self.gauges)):
+            for name, series in sorted(families.items()):
+                self._header(lines, name, kind)
+                for labels, value in sorted(series.items()):
+                    lines.append(f"{name}{format_labels(labels)} {format_value(value)}")
+
+        for name, series in sorted(self.histograms.items()):
+            self._header(lines, name, "histogram")
+            for labels, histogram in sorted(series.items()):
+                cumulative = 0
+                for bound, count in zip(histogram.buckets, histogram.bucket_counts):
+                    cumulative += count
+                    lines.append(f"{name}_bucket{format_labels(labels + (('le', format_value(bound)),))} {cumulative}")
+                lines.append(f"{name}_bucket{format_labels(labels + (('le', '+Inf'),))} {histogram.count}")
+                lines.append(f"{name}_sum{format_labels(labels)} {format_value(histogram.sum)}")
+                lines.append(f"{name}_count{format_labels(labels)} {histogram.count}")
+
+        return "\n".join(lines) + "\n"
+
+    def _header(self, lines: list, name: str, kind: str):
+        if name in self.help:
+            lines.append(f"# HELP {name} {self.help[name]}")
+        lines.append(f"# TYPE {name} {kind}")
+
+
+def escape_label(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def format_labels(labels) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{escape_label(value)}"' for key, value in labels) + "}"
+
+
+def format_value(value: float) -> str:
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+registry = Registry()
+registry.describe("bot_handler_seconds", "Time spent in listeners, app commands and background loop iterations.")
+registry.describe("bot_handler_errors_total", "Handler invocations that raised.")
+registry.describe("bot_db_seconds", "Time spent in database store calls.")
+registry.describe("bot_db_calls_total", "Database store calls.")
+registry.describe("bot_event_loop_lag_seconds", "How late a periodic event loop wakeup fired.")
+
+
+def record_handler(kind: str, name: str, seconds: float, failed: bool = False):
+    registry.observe("bot_handler_seconds", seconds, kind=kind, name=name)
+    if failed:
+        registry.inc("bot_handler_errors_total", kind=kind, name=name)
+
+
+def db_call(store: str):
+    """Count and time a synchronous store function."""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                registry.observe("bot_db_seconds", time.perf_counter() - start, store=store, call=func.__name__)
+                registry.inc("bot_db_calls_total", store=store, call=func.__name__)
+        return wrapper
+    return decorator
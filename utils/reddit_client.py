@@ -0,0 +1,91 @@
+# utils/reddit_client.py
+
+import asyncio
+import time
+
+DEFAULT_LOW_WATER = 10  # requests left in the window before polls are skipped
+DEFAULT_BACKOFF_SECONDS = 60  # used when Reddit 429s us without a reset header
+
+
+class EndpointStats:
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.total_seconds = 0.0
+        self.max_seconds = 0.0
+        self.last_error = None
+
+    def record(self, seconds: float):
+        self.calls += 1
+        self.total_seconds += seconds
+        self.max_seconds = max(self.max_seconds, seconds)
+
+    @property
+    def avg_seconds(self) -> float:
+        return self.total_seconds / self.calls if self.calls else 0.0
+
+
+class InstrumentedReddit:
+    """Wraps a PRAW client, recording per-endpoint usage and the rate limit budget.
+
+    PRAW is synchronous, so every request runs in a worker thread instead of on the event loop.
+    """
+
+    def __init__(self, reddit, low_water: int = DEFAULT_LOW_WATER):
+        self.reddit = reddit
+        self.low_water = low_water
+        self.endpoints = {}  # {endpoint: EndpointStats}
+        self.remaining = None
+        self.used = None
+        self.reset_at = None
+        self.skipped_polls = 0
+
+    async def fetch_new(self, subreddit_name: str, limit: int, endpoint: str) -> list:
+        subreddit = self.reddit.subreddit(subreddit_name)
+        return await self.call(endpoint, lambda: list(subreddit.new(limit=limit)))
+
+    async def call(self, endpoint: str, func):
+        stats = self.endpoints.setdefault(endpoint, EndpointStats())
+        start = time.perf_counter()
+        try:
+            result = await asyncio.to_thread(func)
+        except Exception as e:
+            stats.errors += 1
+            stats.last_error = f"{type(e).__name__}: {e}"
+            # Refreshed first: a 429 without rate-limit headers leaves PRAW's limits stale, and
+            # reading them afterwards would undo the backoff.
+            self._refresh_limits()
+            if type(e).__name__ == "TooManyRequests":
+                self.remaining = 0
+                self.reset_at = max(self.reset_at or 0, time.time() + DEFAULT_BACKOFF_SECONDS)
+            raise
+        finally:
+            stats.record(time.perf_counter() - start)
+        self._refresh_limits()
+        return result
+
+    def _refresh_limits(self):
+        auth = getattr(self.reddit, "auth", None)
+        limits = getattr(auth, "limits", None) or {}
+        if limits.get("remaining") is not None:
+            self.remaining = limits["remaining"]
+        if limits.get("used") is not None:
+            self.used = limits["used"]
+        if limits.get("reset_timestamp") is not None:
+            self.reset_at = limits["reset_timestamp"]
+
+    def seconds_until_reset(self) -> float:
+        if self.reset_at is None:
+            return 0.0
+        return max(0.0, self.reset_at - time.time())
+
+    def is_low(self) -> bool:
+        if self.remaining is None:
+            return False
+        return self.remaining <= self.low_water and self.seconds_until_reset() > 0
+
+    def should_skip_poll(self) -> bool:
+        if self.is_low():
+            self.skipped_polls += 1
+            return True
+        return False
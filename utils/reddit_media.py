@@ -0,0 +1,127 @@
+# utils/reddit_media.py
+#
+# Works out which image RedditMirror embeds for a submission. Reddit sends each image in several
+# sizes (preview.images[].resolutions, media_metadata[].p) next to the full-size source, which can
+# be a multi-megabyte original. The resolver picks the widest size that fits under a width cap, so
+# embeds load quickly. Crossposts resolve through the post they share. Video posts use their
+# poster frame. Results are cached per submission id because Reddit doesn't change media after
+# posting.
+
+import html
+from collections import OrderedDict
+
+from utils.metrics import registry
+
+DEFAULT_MAX_WIDTH = 1080  # overridden by the reddit_preview_max_width setting
+CACHE_SIZE = 512
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".gif", ".webp")
+
+registry.describe("bot_reddit_media_cache_total", "Reddit media lookups by outcome (hit, miss).")
+
+
+class RedditMedia:
+    def __init__(self, image: str = None, gallery: list[str] = None, video_url: str = None):
+        self.image = image
+        self.gallery = gallery or []
+        self.video_url = video_url
+
+    def __repr__(self):
+        return f"<RedditMedia image={self.image!r} gallery={len(self.gallery)} video={self.video_url is not None}>"
+
+
+def field(source, name: str, default=None):
+    # PRAW exposes the post as attributes, but crosspost parents arrive as raw JSON dicts.
+    if isinstance(source, dict):
+        return source.get(name, default)
+    return getattr(source, name, default)
+
+
+def pick_rendition(renditions: list[tuple[str, int]], max_width: int):
+    """Widest (url, width) no wider than max_width, or the narrowest if every one is wider."""
+    renditions = [(url, width or 0) for url, width in renditions if url]
+    if not renditions:
+        return None
+    fitting = [r for r in renditions if r[1] <= max_width]
+    url, _ = max(fitting, key=lambda r: r[1]) if fitting else min(renditions, key=lambda r: r[1])
+    # Reddit HTML-escapes URLs in JSON ("&amp;"), which breaks the signed query string.
+    return html.unescape(url)
+
+
+def gallery_images(source, max_width: int) -> list[str]:
+    metadata = field(source, "media_metadata") or {}
+    items = (field(source, "gallery_data") or {}).get("items", [])
+    images = []
+    for item in items:
+        meta = metadata.get(item.get("media_id"), {})
+        if meta.get("status", "valid") != "valid":
+            continue
+        full = meta.get("s", {})
+        if meta.get("e") == "AnimatedImage":
+            # Resized previews of animated items are still frames; keep the animation.
+            url = html.unescape(full.get("gif") or full.get("u") or "") or None
+        else:
+            renditions = [(p.get("u"), p.get("x")) for p in meta.get("p", [])] + [(full.get("u"), full.get("x"))]
+            url = pick_rendition(renditions, max_width)
+        if url:
+            images.append(url)
+    return images
+
+
+def preview_image(source, max_width: int):
+    images = (field(source, "preview") or {}).get("images") or []
+    if not images:
+        return None
+    image = images[0]
+    full = image.get("source", {})
+    renditions = [(r.get("url"), r.get("width")) for r in image.get("resolutions", [])]
+    return pick_rendition(renditions + [(full.get("url"), full.get("width"))], max_width)
+
+
+def video_url(source):
+    for key in ("secure_media", "media"):
+        video = (field(source, key) or {}).get("reddit_video") or {}
+        if video.get("fallback_url"):
+            return video["fallback_url"]
+    return None
+
+
+def resolve_media(submission, max_width: int = DEFAULT_MAX_WIDTH) -> RedditMedia:
+    parents = field(submission, "crosspost_parent_list") or []
+    source = parents[0] if parents else submission
+
+    if field(source, "is_gallery"):
+        return RedditMedia(gallery=gallery_images(source, max_width))
+
+    url = field(source, "url") or ""
+    is_video = bool(field(source, "is_video"))
+    if url.lower().endswith(".gif"):
+        # A preview would be a still frame of the gif.
+        image = url
+    else:
+        image = preview_image(source, max_width)
+        if image is None and url.lower().endswith(IMAGE_EXTENSIONS):
+            image = url
+    return RedditMedia(image=image, video_url=video_url(source) if is_video else None)
+
+
+class MediaResolver:
+    """resolve_media with an LRU cache keyed by submission id and width cap."""
+
+    def __init__(self, max_entries: int = CACHE_SIZE):
+        self.max_entries = max_entries
+        self.cache = OrderedDict()  # {(submission_id, max_width): RedditMedia}
+
+    def resolve(self, submission, max_width: int = DEFAULT_MAX_WIDTH) -> RedditMedia:
+        key = (submission.id, max_width)
+        media = self.cache.get(key)
+        if media is not None:
+            self.cache.move_to_end(key)
+            registry.inc("bot_reddit_media_cache_total", outcome="hit")
+            return media
+
+        registry.inc("bot_reddit_media_cache_total", outcome="miss")
+        media = resolve_media(submission, max_width)
+        self.cache[key] = media
+        if len(self.cache) > self.max_entries:
+            self.cache.popitem(last=False)
+        return media
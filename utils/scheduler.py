@@ -0,0 +1,128 @@
+# utils/scheduler.py
+#
+# Runs the bot's periodic jobs in place of per-cog tasks.loop()s. Each job's next run time and
+# last outcome are kept in scheduled_jobs (database/jobs_store.py) per cluster worker, so a
+# restart waits out the old schedule instead of firing every job at once. Jobs that are new or
+# overdue are spread over STARTUP_SPREAD_SECONDS, every interval gets some jitter so jobs drift
+# apart, and a semaphore caps how many run at the same time.
+
+import asyncio
+import logging
+import os
+import random
+import sqlite3
+import time
+
+from database.jobs_store import init_jobs_db, get_job, save_job_schedule, record_job_run
+from utils.metrics import record_handler
+
+STARTUP_SPREAD_SECONDS = 30
+DEFAULT_JITTER = 0.1  # each interval is stretched or shrunk by up to 10%
+MAX_CONCURRENT_JOBS = int(os.getenv("SCHEDULER_CONCURRENCY", "2"))
+
+log = logging.getLogger(__name__)
+
+
+class Job:
+    def __init__(self, name: str, func, interval: float, jitter: float):
+        self.name = name
+        self.func = func
+        self.interval = interval
+        self.jitter = jitter
+        self.task = None
+        self.running = False
+        self.next_run = None  # wall-clock time, as stored in the database
+        self.last_started = None
+        self.last_duration = None
+        self.last_status = None
+        self.last_error = None
+        self.runs = 0
+        self.failures = 0
+
+    def next_interval(self) -> float:
+        return self.interval * random.uniform(1 - self.jitter, 1 + self.jitter)
+
+
+class Scheduler:
+    def __init__(self, bot, cluster_id: int = 0, max_concurrent: int = MAX_CONCURRENT_JOBS):
+        self.bot = bot
+        self.cluster_id = cluster_id
+        self.jobs = {}  # {name: Job}; kept after unregister so a reloaded cog resumes its schedule
+        self.semaphore = asyncio.Semaphore(max_concurrent)
+        init_jobs_db()
+
+    def register(self, name: str, func, interval: float, jitter: float = DEFAULT_JITTER):
+        """Run `await func()` every `interval` seconds once the bot is ready."""
+        previous = self.jobs.get(name)
+        job = Job(name, func, interval, jitter)
+        if previous:
+            if previous.task:
+                previous.task.cancel()
+            for attr in ("next_run", "last_started", "last_duration", "last_status", "last_error", "runs", "failures"):
+                setattr(job, attr, getattr(previous, attr))
+        self.jobs[name] = job
+        job.task = asyncio.create_task(self.run_job(job), name=f"job:{name}")
+
+    def unregister(self, name: str):
+        job = self.jobs.get(name)
+        if job and job.task:
+            job.task.cancel()
+            job.task = None
+
+    def close(self):
+        for name in list(self.jobs):
+            self.unregister(name)
+
+    async def persist(self, job: Job, func, *args):
+        """Run a jobs_store call off the loop. A failed write only loses the saved schedule; the
+        job keeps running from its in-memory next_run, so a locked database can't stop it."""
+        try:
+            return await asyncio.to_thread(func, *args)
+        except sqlite3.Error as e:
+            log.warning("Failed to persist schedule for job %s: %s", job.name, e)
+            return None
+
+    async def load_job(self, job: Job):
+        row = await self.persist(job, get_job, job.name, self.cluster_id)
+        if row:
+            (job.next_run, job.last_started, job.last_duration, job.last_status,
+             job.last_error, job.runs, job.failures) = row
+
+    async def run_job(self, job: Job):
+        await self.bot.wait_until_ready()
+        if job.next_run is None:
+            await self.load_job(job)
+
+        now = time.time()
+        if job.next_run is None or job.next_run < now:
+            job.next_run = now + random.uniform(0, min(job.interval, STARTUP_SPREAD_SECONDS))
+            await self.persist(job, save_job_schedule, job.name, self.cluster_id, job.next_run)
+
+        while True:
+            await asyncio.sleep(max(0.0, job.next_run - time.time()))
+            async with self.semaphore:
+                await self.execute(job)
+
+    async def execute(self, job: Job):
+        started = time.time()
+        start = time.perf_counter()
+        error = None
+        job.running = True
+        try:
+            await job.func()
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+            log.exception("Job %s failed", job.name)
+        finally:
+            job.running = False
+
+        duration = time.perf_counter() - start
+        job.next_run = started + job.next_interval()
+        job.last_started = started
+        job.last_duration = duration
+        job.last_status = "error" if error else "ok"
+        job.last_error = error
+        job.runs += 1
+        job.failures += 1 if error else 0
+        record_handler("job", job.name, duration, error is not None)
+        await self.persist(job, record_job_run, job.name, self.cluster_id, started, duration, error, job.next_run)
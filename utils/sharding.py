@@ -0,0 +1,51 @@
+# utils/sharding.py
+
+import asyncio
+import math
+import os
+
+import aiohttp
+
+from database.shard_store import report_shard_health
+
+HEALTH_INTERVAL_SECONDS = 30
+STALE_AFTER_SECONDS = 90  # a shard that hasn't reported for this long is considered down
+GATEWAY_BOT_URL = "https://discord.com/api/v10/gateway/bot"
+
+
+def shard_groups(shard_count: int, cluster_count: int) -> list[list[int]]:
+    """Split shard ids into contiguous groups, one per worker process."""
+    cluster_count = max(1, min(cluster_count, shard_count))
+    size = math.ceil(shard_count / cluster_count)
+    return [list(range(start, min(start + size, shard_count))) for start in range(0, shard_count, size)]
+
+
+async def fetch_recommended_shard_count(token: str) -> int:
+    async with aiohttp.ClientSession() as session:
+        async with session.get(GATEWAY_BOT_URL, headers={"Authorization": f"Bot {token}"}) as res:
+            res.raise_for_status()
+            data = await res.json()
+    return data["shards"]
+
+
+def shard_latencies(bot) -> list[tuple[int, float]]:
+    if hasattr(bot, "latencies"):
+        return bot.latencies
+    return [(bot.shard_id or 0, bot.latency)]
+
+
+async def report_health_forever(bot, cluster_id: int):
+    await bot.wait_until_ready()
+    while not bot.is_closed():
+        guild_counts = {}
+        for guild in bot.guilds:
+            guild_counts[guild.shard_id] = guild_counts.get(guild.shard_id, 0) + 1
+
+        for shard_id, latency in shard_latencies(bot):
+            await asyncio.to_thread(
+                report_shard_health,
+                shard_id, cluster_id, os.getpid(),
+                None if math.isnan(latency) else latency,
+                guild_counts.get(shard_id, 0)
+            )
+        await asyncio.sleep(HEALTH_INTERVAL_SECONDS)
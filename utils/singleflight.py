@@ -0,0 +1,70 @@
+# utils/singleflight.py
+
+import asyncio
+import functools
+import time
+
+from utils.metrics import registry
+
+registry.describe("bot_singleflight_calls_total", "Coalesced fetch calls by outcome (miss, joined, cached).")
+
+
+class SingleFlight:
+    """Shares one in-flight call per key between concurrent callers, and keeps its result for ttl seconds."""
+
+    def __init__(self, name: str, ttl: float, should_cache=None, max_entries: int = 256):
+        self.name = name
+        self.ttl = ttl
+        self.should_cache = should_cache or (lambda result: True)
+        self.max_entries = max_entries
+        self.in_flight = {}  # {key: asyncio.Task}
+        self.results = {}  # {key: (expires_at, result)}
+
+    async def run(self, key, func, *args, **kwargs):
+        cached = self.results.get(key)
+        if cached and cached[0] > time.monotonic():
+            registry.inc("bot_singleflight_calls_total", name=self.name, outcome="cached")
+            return cached[1]
+
+        task = self.in_flight.get(key)
+        if task is None:
+            registry.inc("bot_singleflight_calls_total", name=self.name, outcome="miss")
+            task = asyncio.ensure_future(func(*args, **kwargs))
+            self.in_flight[key] = task
+            task.add_done_callback(functools.partial(self.finish, key))
+        else:
+            registry.inc("bot_singleflight_calls_total", name=self.name, outcome="joined")
+
+        # Shielded so one caller giving up doesn't cancel the fetch for everyone else.
+        return await asyncio.shield(task)
+
+    def finish(self, key, task: asyncio.Task):
+        self.in_flight.pop(key, None)
+        if task.cancelled() or task.exception() is not None:
+            return
+
+        result = task.result()
+        if not self.should_cache(result):
+            return
+
+        now = time.monotonic()
+        if len(self.results) >= self.max_entries:
+            self.results = {k: v for k, v in self.results.items() if v[0] > now}
+        self.results[key] = (now + self.ttl, result)
+
+    def clear(self):
+        self.results.clear()
+
+
+def single_flight(ttl: float, key, should_cache=None):
+    """Coalesce concurrent calls to an async function that map to the same key(*args, **kwargs)."""
+    def decorator(func):
+        flight = SingleFlight(func.__qualname__, ttl, should_cache)
+
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            return await flight.run(key(*args, **kwargs), func, *args, **kwargs)
+
+        wrapper.flight = flight
+        return wrapper
+    return decorator
@@ -0,0 +1,24 @@
+# utils/state_handoff.py
+#
+# Carries a cog's in-memory state across /reload_cog. The outgoing instance stashes a snapshot
+# from cog_unload (see export_state on the cogs), and the incoming instance takes it in __init__
+# before starting any tasks. Snapshots live on the bot, which outlives the reload, and expire
+# after a minute so a plain unload followed by a much later load starts fresh. Periodic jobs
+# don't need this: the scheduler (utils/scheduler.py) keeps their next run time itself.
+
+import time
+
+HANDOFF_MAX_AGE_SECONDS = 60
+
+
+def stash_state(bot, name: str, state: dict):
+    if not hasattr(bot, "state_handoff"):
+        bot.state_handoff = {}
+    bot.state_handoff[name] = (time.monotonic(), state)
+
+
+def take_state(bot, name: str):
+    stashed = getattr(bot, "state_handoff", {}).pop(name, None)
+    if stashed is None or time.monotonic() - stashed[0] > HANDOFF_MAX_AGE_SECONDS:
+        return None
+    return stashed[1]
@@ -0,0 +1,28 @@
+# utils/views.py
+
+import discord
+
+
+def link_view(*links: tuple[str, str]) -> discord.ui.View:
+    """Build a view of URL buttons from (label, url) pairs that discord.py won't keep in its view store.
+
+    Link buttons never produce interactions, so the view is stopped up front; send() only
+    stores views that haven't finished, which otherwise keeps one entry per message for good.
+    """
+    view = discord.ui.View(timeout=None)
+    for label, url in links:
+        view.add_item(discord.ui.Button(label=label, url=url))
+    view.stop()
+    return view
+
+
+def view_store_report(bot) -> dict:
+    """Count what discord.py's view store is holding (reads ConnectionState._view_store)."""
+    store = bot._connection._view_store
+    return {
+        "message_entries": sum(1 for message_id in store._views if message_id is not None),
+        "dispatchable_items": sum(len(items) for items in store._views.values()),
+        "message_views": len(store._synced_message_views),
+        "persistent_views": len(store.persistent_views),
+        "modals": len(store._modals),
+    }